@@ -3,15 +3,16 @@ import React, { useEffect, useState } from 'react';
 // import Card from '../components/Card';
 import ImageDisplay from '../components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
+import { fetchReport } from '@/lib/api';
 
 interface EdaData {
     churn_risk_by_gender: string;
     churn_risk_by_geography: string;
     // summary: string; // JSON string containing summary statistics
-    // histogram: string; // Base64 string for histogram image
-    gender_distribution: string; // Base64 string for gender distribution image
-    geography_distribution: string; // Base64 string for geography distribution image
-    // correlation_heatmap: string; // Base64 string for correlation heatmap image
+    // histogram: string; // URL of histogram image
+    gender_distribution: string; // URL of gender distribution image
+    geography_distribution: string; // URL of geography distribution image
+    // correlation_heatmap: string; // URL of correlation heatmap image
 }
 
 const EdaResults: React.FC = () => {
@@ -20,8 +21,7 @@ const EdaResults: React.FC = () => {
     useEffect(() => {
         const fetchEdaData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-eda');
-                const data = await response.json();
+                const data = await fetchReport<EdaData>('run-eda');
                 console.log(data);
                 setEdaData(data);
             } catch (error) {
@@ -46,15 +46,15 @@ const EdaResults: React.FC = () => {
                 {/* <Card title="Summary Statistics">
                 <pre className="bg-gray-100 p-4 rounded overflow-x-auto">{JSON.stringify(JSON.parse(edaData.summary), null, 2)}</pre>
             </Card> */}
-                <ImageDisplay base64Image={edaData.churn_risk_by_gender} />
-                <ImageDisplay base64Image={edaData.churn_risk_by_geography} />
+                <ImageDisplay url={edaData.churn_risk_by_gender} />
+                <ImageDisplay url={edaData.churn_risk_by_geography} />
                 <div className='flex justify-evenly items-center'>
-                    <ImageDisplay title="Gender Distribution" base64Image={edaData.gender_distribution} />
-                    <ImageDisplay title="Geography Distribution" base64Image={edaData.geography_distribution} />
+                    <ImageDisplay title="Gender Distribution" url={edaData.gender_distribution} />
+                    <ImageDisplay title="Geography Distribution" url={edaData.geography_distribution} />
                 </div>
-                {/* <ImageDisplay title="Correlation Heatmap" base64Image={edaData.correlation_heatmap} /> */}
+                {/* <ImageDisplay title="Correlation Heatmap" url={edaData.correlation_heatmap} /> */}
                 {/* 
-                <ImageDisplay title="Histogram" base64Image={edaData.histogram} />
+                <ImageDisplay title="Histogram" url={edaData.histogram} />
             */}
             </CardContent>
         </Card >
@@ -1,13 +1,21 @@
 // src/components/ImageDisplay.tsx
+import { API_URL } from '@/lib/api';
+
 interface ImageDisplayProps {
     title?: string;
-    base64Image: string;
+    base64Image?: string;
+    url?: string;
 }
 
-const ImageDisplay: React.FC<ImageDisplayProps> = ({ title = null, base64Image }) => (
+// Figures given by url are fetched by the browser in parallel and revalidated against their ETag
+const ImageDisplay: React.FC<ImageDisplayProps> = ({ title = null, base64Image, url }) => (
     <div className="mb-4">
         {title && <h3 className="font-semibold mt-2">{title}</h3>}
-        <img src={`data:image/png;base64,${base64Image}`} alt={title ? title : ""} className="rounded-lg" />
+        <img
+            src={url ? `${API_URL}${url}` : `data:image/png;base64,${base64Image}`}
+            alt={title ? title : ""}
+            className="rounded-lg"
+        />
     </div>
 );
 
@@ -2,6 +2,7 @@
 import React, { useEffect, useState } from 'react';
 import ImageDisplay from '../components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
+import { fetchReport } from '@/lib/api';
 
 
 
@@ -14,8 +15,8 @@ interface Metrics {
 }
 
 interface ConfusionMatrix {
-    normal: string; // Base64 string for the normal confusion matrix image
-    normalized: string; // Base64 string for the normalized confusion matrix image
+    normal: string; // URL of the normal confusion matrix image
+    normalized: string; // URL of the normalized confusion matrix image
 }
 
 interface MLData {
@@ -32,9 +33,7 @@ const MlResults: React.FC = () => {
     useEffect(() => {
         const fetchMlData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-ml');
-
-                const data = await response.json();
+                const data = await fetchReport<MLData>('run-ml');
                 console.log(data);
                 setMlData(data);
             } catch (error) {
@@ -57,8 +56,8 @@ const MlResults: React.FC = () => {
             </CardHeader>
             <CardContent className='flex justify-evenly items-center flex-wrap'>
 
-                <ImageDisplay base64Image={mlData.accuracy_pie} />
-                <ImageDisplay base64Image={mlData.model_performance_metrics} />
+                <ImageDisplay url={mlData.accuracy_pie} />
+                <ImageDisplay url={mlData.model_performance_metrics} />
 
                 {/* <Card title='Model Metrics'>
                 {Object.entries(mlData.model_metrics).map(([model, metrics]) => (
@@ -78,8 +77,8 @@ const MlResults: React.FC = () => {
                 {Object.entries(mlData.confusion_matrices).map(([model, matrices]) => (
                     <div key={model} className="mb-4">
                         <h3 className="font-semibold">{model}</h3>
-                        <ImageDisplay title={`${model} Confusion Matrix`} base64Image={matrices.normal} />
-                        <ImageDisplay title={`${model} Normalized Confusion Matrix`} base64Image={matrices.normalized} />
+                        <ImageDisplay title={`${model} Confusion Matrix`} url={matrices.normal} />
+                        <ImageDisplay title={`${model} Normalized Confusion Matrix`} url={matrices.normalized} />
                     </div>
                 ))}
             </Card> */}
@@ -0,0 +1,22 @@
+// Base URL of the Flask API
+export const API_URL = 'http://localhost:8000';
+
+// Report routes answer with /plots URLs instead of inline base64 images
+export const reportUrl = (route: string) => `${API_URL}/${route}?images=url`;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Report routes queue a job; poll it (backing off up to 2s) until the report is ready
+export async function fetchReport<T>(route: string): Promise<T> {
+    let job = await (await fetch(reportUrl(route))).json();
+    let delay = 250;
+    while (job.status === 'queued' || job.status === 'running') {
+        await sleep(delay);
+        delay = Math.min(delay * 2, 2000);
+        job = await (await fetch(`${API_URL}${job.status_url}`)).json();
+    }
+    if (job.status !== 'done') {
+        throw new Error(job.error ?? `Report job for ${route} failed`);
+    }
+    return job.result as T;
+}
@@ -2,6 +2,7 @@
 import ImageDisplay from '@/components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import React, { useEffect, useState, } from 'react';
+import { fetchReport } from '@/lib/api';
 
 interface DecisionTreeData {
     accuracy_plot: string;
@@ -18,8 +19,7 @@ const DecisionTree: React.FC = () => {
     useEffect(() => {
         const fetchEdaData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-dt');
-                const data = await response.json();
+                const data = await fetchReport<DecisionTreeData>('run-dt');
                 console.log(data);
                 setDTData(data);
             } catch (error) {
@@ -41,12 +41,12 @@ const DecisionTree: React.FC = () => {
                 <CardDescription>Results of The Descision Tree File</CardDescription>
             </CardHeader>
             <CardContent className='flex items-center justify-evenly flex-wrap'>
-                <ImageDisplay base64Image={DTData.accuracy_plot} />
-                <ImageDisplay base64Image={DTData.classification_report} />
-                <ImageDisplay base64Image={DTData.confusion_matrix} />
-                <ImageDisplay base64Image={DTData.feature_importance} />
-                <ImageDisplay base64Image={DTData.precision_recall_curve} />
-                <ImageDisplay base64Image={DTData.roc_curve} />
+                <ImageDisplay url={DTData.accuracy_plot} />
+                <ImageDisplay url={DTData.classification_report} />
+                <ImageDisplay url={DTData.confusion_matrix} />
+                <ImageDisplay url={DTData.feature_importance} />
+                <ImageDisplay url={DTData.precision_recall_curve} />
+                <ImageDisplay url={DTData.roc_curve} />
             </CardContent>
         </Card >
     );
@@ -2,6 +2,7 @@
 import ImageDisplay from '@/components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import React, { useEffect, useState, } from 'react';
+import { fetchReport } from '@/lib/api';
 
 interface LogisticRegressionData {
     accuracy_plot: string;
@@ -18,8 +19,7 @@ const LogisticRegression: React.FC = () => {
     useEffect(() => {
         const fetchEdaData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-lr');
-                const data = await response.json();
+                const data = await fetchReport<LogisticRegressionData>('run-lr');
                 console.log(data);
                 setLRData(data);
             } catch (error) {
@@ -41,12 +41,12 @@ const LogisticRegression: React.FC = () => {
                 <CardDescription>Results of The Logistic Regression File</CardDescription>
             </CardHeader>
             <CardContent className='flex items-center justify-evenly flex-wrap'>
-                <ImageDisplay base64Image={LRData.accuracy_plot} />
-                <ImageDisplay base64Image={LRData.classification_report} />
-                <ImageDisplay base64Image={LRData.confusion_matrix} />
-                <ImageDisplay base64Image={LRData.feature_importance} />
-                <ImageDisplay base64Image={LRData.precision_recall_curve} />
-                <ImageDisplay base64Image={LRData.roc_curve} />
+                <ImageDisplay url={LRData.accuracy_plot} />
+                <ImageDisplay url={LRData.classification_report} />
+                <ImageDisplay url={LRData.confusion_matrix} />
+                <ImageDisplay url={LRData.feature_importance} />
+                <ImageDisplay url={LRData.precision_recall_curve} />
+                <ImageDisplay url={LRData.roc_curve} />
             </CardContent>
         </Card >
     );
@@ -2,6 +2,7 @@
 import ImageDisplay from '@/components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import React, { useEffect, useState, } from 'react';
+import { fetchReport } from '@/lib/api';
 
 interface RandomForestData {
     accuracy_plot: string;
@@ -18,8 +19,7 @@ const RandomForest: React.FC = () => {
     useEffect(() => {
         const fetchEdaData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-rf');
-                const data = await response.json();
+                const data = await fetchReport<RandomForestData>('run-rf');
                 console.log(data);
                 setRFData(data);
             } catch (error) {
@@ -41,12 +41,12 @@ const RandomForest: React.FC = () => {
                 <CardDescription>Results of The Random Forest File</CardDescription>
             </CardHeader>
             <CardContent className='flex items-center justify-evenly flex-wrap'>
-                <ImageDisplay base64Image={RFData.accuracy_plot} />
-                <ImageDisplay base64Image={RFData.classification_report} />
-                <ImageDisplay base64Image={RFData.confusion_matrix} />
-                <ImageDisplay base64Image={RFData.feature_importance} />
-                <ImageDisplay base64Image={RFData.precision_recall_curve} />
-                <ImageDisplay base64Image={RFData.roc_curve} />
+                <ImageDisplay url={RFData.accuracy_plot} />
+                <ImageDisplay url={RFData.classification_report} />
+                <ImageDisplay url={RFData.confusion_matrix} />
+                <ImageDisplay url={RFData.feature_importance} />
+                <ImageDisplay url={RFData.precision_recall_curve} />
+                <ImageDisplay url={RFData.roc_curve} />
             </CardContent>
         </Card >
     );
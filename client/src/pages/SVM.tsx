@@ -2,6 +2,7 @@
 import ImageDisplay from '@/components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import React, { useEffect, useState, } from 'react';
+import { fetchReport } from '@/lib/api';
 
 interface SVMData {
     accuracy_plot: string;
@@ -15,8 +16,7 @@ export const SVM: React.FC = () => {
     useEffect(() => {
         const fetchEdaData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-svm');
-                const data = await response.json();
+                const data = await fetchReport<SVMData>('run-svm');
                 console.log(data);
                 setSVMData(data);
             } catch (error) {
@@ -38,9 +38,9 @@ export const SVM: React.FC = () => {
                 <CardDescription>Results of The Random Forest File</CardDescription>
             </CardHeader>
             <CardContent className='flex items-center justify-evenly flex-wrap'>
-                <ImageDisplay base64Image={SVMData.accuracy_plot} />
-                <ImageDisplay base64Image={SVMData.classification_report} />
-                <ImageDisplay base64Image={SVMData.confusion_matrix} />
+                <ImageDisplay url={SVMData.accuracy_plot} />
+                <ImageDisplay url={SVMData.classification_report} />
+                <ImageDisplay url={SVMData.confusion_matrix} />
             </CardContent>
         </Card >
     );
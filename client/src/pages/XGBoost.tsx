@@ -2,6 +2,7 @@
 import ImageDisplay from '@/components/ImageDisplay';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import React, { useEffect, useState, } from 'react';
+import { fetchReport } from '@/lib/api';
 
 interface XGBoostData {
     accuracy_plot: string;
@@ -18,8 +19,7 @@ const XGBoost: React.FC = () => {
     useEffect(() => {
         const fetchEdaData = async () => {
             try {
-                const response = await fetch('http://localhost:8000/run-xgboost');
-                const data = await response.json();
+                const data = await fetchReport<XGBoostData>('run-xgboost');
                 console.log(data);
                 setXGData(data);
             } catch (error) {
@@ -41,12 +41,12 @@ const XGBoost: React.FC = () => {
                 <CardDescription>Results of The XGBoost File</CardDescription>
             </CardHeader>
             <CardContent className='flex items-center justify-evenly flex-wrap'>
-                <ImageDisplay base64Image={XGData.accuracy_plot} />
-                <ImageDisplay base64Image={XGData.classification_report} />
-                <ImageDisplay base64Image={XGData.confusion_matrix} />
-                <ImageDisplay base64Image={XGData.feature_importance} />
-                <ImageDisplay base64Image={XGData.precision_recall_curve} />
-                <ImageDisplay base64Image={XGData.roc_curve} />
+                <ImageDisplay url={XGData.accuracy_plot} />
+                <ImageDisplay url={XGData.classification_report} />
+                <ImageDisplay url={XGData.confusion_matrix} />
+                <ImageDisplay url={XGData.feature_importance} />
+                <ImageDisplay url={XGData.precision_recall_curve} />
+                <ImageDisplay url={XGData.roc_curve} />
             </CardContent>
         </Card >
     );
@@ -1,8 +1,34 @@
-import numpy as np
-from flask import Flask, request, jsonify
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import joblib
-from scripts.churn_eda import churn_eda
+from chart_data import CHART_POINTS
+from churn_cube import CUBE_DIMENSIONS, churn_cube
+from coalescer import PredictionCoalescer
+from cross_validation import cross_validation_report
+from compiled_models import compile_models
+from image_store import IMAGE_FORMATS, image_store
+from jobs import JobQueueFull, JobRunner
+from keras_worker import KERAS_FILE, KerasWorker
+from model_registry import ServingModels, get_model, registry
+from prediction_cache import PredictionCache
+from report_cache import report_cache
+from shared_encoding import share_preprocessors
+from scoring import (
+    build_feature_frame,
+    customer_details,
+    iter_csv_customers,
+    iter_ndjson_customers,
+    missing_fields,
+    parse_features,
+    read_csv_customers,
+    score_models,
+    stream_predictions,
+    validate_customers,
+)
+from utils import plot_format, prepare_data
+from scripts.churn_eda import churn_eda, churn_segment
 from scripts.churning_model import generate_results
 from scripts.DT_modelling import generate_dt_plots
 from scripts.XGBoost_modelling import generate_xg_plots
@@ -13,29 +39,223 @@ from scripts.SVM_modelling import generate_svm_plots
 app = Flask(__name__)
 CORS(app)
 
-# Load saved models
-try:
-    dt_model = joblib.load('models/nate_decision_tree.sav')
-    lr_model = joblib.load('models/nate_logistic_regression.sav')
-    rf_model = joblib.load('models/nate_random_forest.sav')
-    svm_model = joblib.load('models/SVM_model.sav')
-    xgb_model = joblib.load('models/XGBoost_model.sav')
-except Exception as e:
-    app.logger.error(f"Error loading models: {e}")
-    raise e
-
-# Dictionary of all loaded models
-loaded_models = {
-    'Decision Tree': dt_model,
-    'Logistic Regression': lr_model,
-    'Random Forest': rf_model,
-    'SVM': svm_model,
-    'XGBoost': xgb_model
+# Rows scored per model call by /predict/stream (overridable with ?chunk_size=)
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 1000))
+
+# How the per-model loop runs: 'sequential' or 'parallel' (overridable with ?mode=)
+PREDICT_MODE = os.environ.get('PREDICT_MODE', 'sequential')
+
+# Deadline per model in parallel mode, with optional overrides such as "SVM=5,XGBoost=1"
+MODEL_TIMEOUT_SECONDS = float(os.environ.get('MODEL_TIMEOUT_SECONDS', 2.0))
+MODEL_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, seconds in (
+        item.split('=', 1) for item in os.environ.get('MODEL_TIMEOUTS', '').split(',') if '=' in item
+    )
+}
+
+# Shared pool the models fan out over in parallel mode (sklearn/XGBoost release the GIL)
+model_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PREDICT_WORKERS', os.cpu_count() or 4)),
+    thread_name_prefix='predict'
+)
+PARALLEL_OPTIONS = {"executor": model_executor, "timeout": MODEL_TIMEOUT_SECONDS, "model_timeouts": MODEL_TIMEOUTS}
+
+# LRU + TTL cache in front of the /predict model loop (size 0 disables it)
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+)
+
+# Models served by /predict: display name -> registry key
+SERVING_MODELS = {
+    'Decision Tree': 'decision_tree',
+    'Logistic Regression': 'logistic_regression',
+    'Random Forest': 'random_forest',
+    'SVM': 'svm',
+    'XGBoost': 'xgboost'
+}
+
+# The Keras model joins /predict from its own TensorFlow worker process ('0' leaves it out).
+# The registry opens its artifact in the worker, so a worker that cannot start leaves it out.
+KERAS_SERVING = os.environ.get('KERAS_SERVING', '1') == '1'
+keras_worker = KerasWorker()
+if KERAS_SERVING:
+    registry.register('keras', KERAS_FILE, keras_worker.load)
+    SERVING_MODELS['Keras'] = 'keras'
+
+# Served models too slow to load inside a request (starting TensorFlow takes up to
+# KERAS_LOAD_TIMEOUT_SECONDS): loaded in the background and swapped in once ready
+BACKGROUND_MODELS = {'keras'} if KERAS_SERVING else set()
+
+# 'compiled' swaps the tree and linear pipelines for NumPy scorers verified on first load
+INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'sklearn')
+
+# Run each distinct columntransformer once per batch instead of once per model
+SHARED_ENCODING = os.environ.get('SHARED_ENCODING', '1') == '1'
+
+# Report behind each /run-* route and /plots/<report>/... URL
+REPORT_BUILDERS = {
+    'eda': churn_eda,
+    'ml': generate_results,
+    'dt': generate_dt_plots,
+    'lr': generate_lr_plots,
+    'rf': generate_rf_plots,
+    'xgboost': generate_xg_plots,
+    'svm': generate_svm_plots,
+    'cv': cross_validation_report
 }
 
-# Function to decode predictions
-def decode(pred):
-    return 'Customer Exits' if pred == 1 else 'Customer Stays'
+# Report builds run here instead of in request threads, so /predict keeps its workers
+job_runner = JobRunner(
+    workers=int(os.environ.get('REPORT_JOB_WORKERS', 2)),
+    max_queued=int(os.environ.get('REPORT_JOB_QUEUE_SIZE', 32)),
+    ttl=float(os.environ.get('REPORT_JOB_TTL', 600))
+)
+
+# Figure URLs are stable per report, so clients revalidate them (304 when unchanged)
+PLOT_CACHE_CONTROL = os.environ.get('PLOT_CACHE_CONTROL', 'public, no-cache')
+
+# Seconds a /plots client is told to wait while the report behind the figure is built
+PLOT_RETRY_AFTER_SECONDS = int(os.environ.get('PLOT_RETRY_AFTER_SECONDS', 2))
+
+
+def request_shaped_sample(size=None):
+    """Returns test-split customers (all, or the first size) typed the way /predict builds its frames.
+
+    The cached split uses compact category/int16 dtypes; requests arrive as
+    build_feature_frame's object/float64 columns, which is what models are
+    actually given, so checks run on that.
+    """
+    _, X_test, _, _, _, _ = prepare_data()
+    rows = X_test if size is None else X_test.head(size)
+    return build_feature_frame(rows.astype(object).values.tolist())
+
+
+def build_serving_models():
+    """Resolves the served models through the registry and applies the inference stages."""
+    models = {}
+    versions = {}
+    for model_name, key in SERVING_MODELS.items():
+        if key in BACKGROUND_MODELS and registry.version(key) is None:
+            # Not loaded yet; load_background_models adds it
+            continue
+        try:
+            models[model_name] = get_model(key)
+            versions[model_name] = registry.version(key)
+        except Exception as e:
+            app.logger.error(f"Error loading {model_name}: {e}")
+
+    if INFERENCE_MODE == 'compiled':
+        models = compile_models(models, request_shaped_sample())
+
+    if SHARED_ENCODING:
+        models = share_preprocessors(models)
+    return ServingModels(models, versions)
+
+
+_serving_models = None
+_serving_lock = threading.Lock()
+
+
+def serving_snapshot():
+    """Returns the current snapshot of served models, building it on first use."""
+    global _serving_models
+    if _serving_models is None:
+        with _serving_lock:
+            if _serving_models is None:
+                _serving_models = build_serving_models()
+    return _serving_models
+
+
+_background_pid = None
+
+
+def load_background_models():
+    """Loads BACKGROUND_MODELS on a thread, once per process, adding each to the snapshot when ready."""
+    global _background_pid
+    if not BACKGROUND_MODELS or _background_pid == os.getpid():
+        return
+    with _serving_lock:
+        if _background_pid == os.getpid():
+            return
+        _background_pid = os.getpid()
+
+    def load():
+        for key in BACKGROUND_MODELS:
+            try:
+                registry.get(key)
+            except Exception as e:
+                # Recorded by the registry, which loads it once a new artifact is published
+                app.logger.error(f"Error loading {key}: {e}")
+                continue
+            swap_serving_models(key, registry.version(key))
+
+    threading.Thread(target=load, name='background-models', daemon=True).start()
+
+
+def loaded_models():
+    """The snapshot routes score with; the first call in each process starts its watcher and background loads."""
+    registry.watch(MODEL_WATCH_INTERVAL)
+    load_background_models()
+    return serving_snapshot()
+
+
+def validate_model(key, model):
+    """Smoke-tests a freshly loaded artifact before the registry swaps it in."""
+    sample = request_shaped_sample(SMOKE_BATCH_SIZE)
+    labels = model.predict(sample)
+    if len(labels) != len(sample) or not set(labels) <= {0, 1}:
+        raise ValueError(f"{key} returned unexpected predictions on the smoke batch")
+
+
+def swap_serving_models(key, version):
+    """Rebuilds the served snapshot after the registry swapped in a new artifact."""
+    global _serving_models
+    if key not in SERVING_MODELS.values():
+        return
+    with _serving_lock:
+        # Requests holding the previous snapshot finish on it
+        _serving_models = build_serving_models()
+    app.logger.info(f"Serving {key} version {version}")
+
+
+# Hot reload: new artifacts under models/ are loaded, smoke-tested and swapped in
+SMOKE_BATCH_SIZE = int(os.environ.get('SMOKE_BATCH_SIZE', 64))
+registry.validator = validate_model
+registry.add_listener(swap_serving_models)
+
+# Seconds between polls of models/; each process (every forked gunicorn worker) polls on its own
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 5))
+
+# With gunicorn --preload, load in the master so forked workers share the pages.
+# Compiled mode always builds up front, so verification never runs inside a request.
+if os.environ.get('PRELOAD_MODELS', '0') == '1' or INFERENCE_MODE == 'compiled':
+    serving_snapshot()
+
+# Start the TensorFlow worker at startup instead of on the first /predict
+if KERAS_SERVING and os.environ.get('PRELOAD_KERAS', '0') == '1':
+    load_background_models()
+
+# Build the churn cube in the background at startup; /eda/cube rebuilds it when the data changes
+if os.environ.get('PRELOAD_CHURN_CUBE', '1') == '1':
+    threading.Thread(target=churn_cube.get, name='churn-cube', daemon=True).start()
+
+# Optional micro-batching of concurrent single-customer /predict calls
+if os.environ.get('PREDICT_COALESCE', '0') == '1':
+    coalescer = PredictionCoalescer(
+        loaded_models,
+        max_wait=float(os.environ.get('COALESCE_MAX_WAIT_MS', 5)) / 1000,
+        max_batch=int(os.environ.get('COALESCE_MAX_BATCH', 64)),
+        **(PARALLEL_OPTIONS if PREDICT_MODE == 'parallel' else {})
+    )
+else:
+    coalescer = None
+
+def scoring_options():
+    """Returns the score_models options for the execution mode of this request."""
+    mode = request.args.get('mode', PREDICT_MODE)
+    return PARALLEL_OPTIONS if mode == 'parallel' else {}
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -44,52 +264,30 @@ def predict():
         data = request.json
 
         # Ensure all expected keys are present
-        required_keys = [
-            'creditScore', 'geography', 'gender', 'age', 'tenure',
-            'balance', 'numofproducts', 'hascrcard', 'isactivemember', 'estimatedsalary'
-        ]
-        missing_keys = [key for key in required_keys if not data.get(key)]
+        missing_keys = missing_fields(data)
         if missing_keys:
             return jsonify({"error": f"Missing fields: {', '.join(missing_keys)}"}), 400
 
-        values = [
-            float(data['creditScore']),
-            data['geography'],
-            data['gender'],
-            float(data['age']),
-            float(data['tenure']),
-            float(data['balance']),
-            int(data['numofproducts']),
-            int(data['hascrcard']),
-            int(data['isactivemember']),
-            float(data['estimatedsalary']),
-        ]
-
         # Prepare data for model prediction
-        new_array = np.array(values).reshape(1, -1)
+        values = parse_features(data)
 
         # Customer details dictionary
-        custd = {
-            "CreditScore": data['creditScore'],
-            "Geography": data['geography'],
-            "Gender": data['gender'],
-            "Age": data['age'],
-            "Tenure": data['tenure'],
-            "Balance": data['balance'],
-            "NumOfProducts": data['numofproducts'],
-            "HasCrCard": "Yes" if data['hascrcard'] == "1" else "No",
-            "IsActiveMember": "Yes" if data['isactivemember'] == "1" else "No",
-            "EstimatedSalary": data['estimatedsalary']
-        }
+        custd = customer_details(data)
 
-        # Model predictions
-        predictions = []
-        for model_name, model in loaded_models.items():
-            try:
-                prediction = decode(model.predict(new_array)[0])
-                predictions.append({"model": model_name, "prediction": prediction})
-            except Exception as e:
-                app.logger.error(f"Error: {str(e)}")
+        # Model predictions, served from the cache when this profile was seen recently
+        models = loaded_models()
+        predictions = prediction_cache.get(values, models.version)
+        if predictions is None:
+            if coalescer is not None:
+                predictions = coalescer.submit(values).result()
+            else:
+                features = build_feature_frame([values])
+                predictions = score_models(models, features, **scoring_options())[0]
+
+            # Only cache complete answers, never partial or timed-out ones
+            complete = len(predictions) == len(models)
+            if complete and not any(p.get("timed_out") for p in predictions):
+                prediction_cache.put(values, models.version, predictions)
 
         # Response JSON
         response = {
@@ -106,18 +304,278 @@ def predict():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/predict/cache', methods=['GET'])
+def predict_cache_stats():
+    """Route to report prediction cache hit/miss counters."""
+    return jsonify(prediction_cache.stats()), 200
+
+
+@app.route('/predict/coalescer', methods=['GET'])
+def predict_coalescer_stats():
+    """Route to report micro-batching counters."""
+    if coalescer is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **coalescer.stats()}), 200
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Route to score many customers (JSON list or CSV upload) in one pass."""
+    try:
+        # Accept a multipart CSV upload, a raw CSV body, or a JSON list
+        if 'file' in request.files:
+            records = read_csv_customers(request.files['file'].read().decode('utf-8'))
+        elif request.mimetype == 'text/csv':
+            records = read_csv_customers(request.get_data(as_text=True))
+        else:
+            data = request.get_json(silent=True)
+            records = data.get('customers') if isinstance(data, dict) else data
+
+        if not isinstance(records, list) or not records:
+            return jsonify({"error": "Expected a non-empty list of customers"}), 400
+
+        # Validate every customer before scoring anything
+        rows, errors = validate_customers(records)
+        if errors:
+            return jsonify({"error": "Invalid input data", "details": errors}), 400
+
+        # One typed frame, one predict call per model
+        features = build_feature_frame(rows)
+        predictions = score_models(loaded_models(), features, **scoring_options())
+
+        # Same per-customer shape as /predict
+        response = [
+            {"customer": customer_details(data), "predictions": customer_predictions}
+            for data, customer_predictions in zip(records, predictions)
+        ]
+
+        return jsonify(response), 200
+    except UnicodeDecodeError as ue:
+        app.logger.error(f"UnicodeDecodeError: {str(ue)}")
+        return jsonify({"error": "CSV upload must be UTF-8 encoded"}), 400
+    except Exception as e:
+        app.logger.error(f"Error in batch prediction: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """Route to score NDJSON or CSV input incrementally, streaming NDJSON results back."""
+    chunk_size = request.args.get('chunk_size', STREAM_CHUNK_SIZE, type=int)
+    if chunk_size < 1:
+        return jsonify({"error": "chunk_size must be a positive integer"}), 400
+
+    # Read the body line by line instead of buffering it
+    if request.mimetype == 'text/csv':
+        records = iter_csv_customers(request.stream)
+    else:
+        records = iter_ndjson_customers(request.stream)
+
+    results = stream_predictions(loaded_models(), records, chunk_size, **scoring_options())
+    return Response(stream_with_context(results), mimetype='application/x-ndjson')
+
+
+@app.route('/models', methods=['GET'])
+def models_stats():
+    """Route to report which model artifacts are loaded and the memory they cost."""
+    return jsonify({**registry.stats(), "keras": keras_worker.stats()}), 200
+
+
 @app.route('/', methods=['GET'])
 def home():
     """Health check route."""
     return jsonify({"message": "Welcome to the Bank Customer Churn Prediction API!"})
 
 
+def report_params(image_format):
+    # PNG reports keep the cache variant they had before other formats existed
+    return {"format": image_format} if image_format != 'png' else None
+
+
+def build_report(name, image_format='png', refresh=False):
+    """Returns a report from the on-disk report cache, regenerating it only when an input changed."""
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    def build():
+        with plot_format(image_format):
+            return REPORT_BUILDERS[name]()
+
+    return report_cache.get_or_build(name, build, params=report_params(image_format), refresh=refresh)
+
+
+def build_report_data(name, points=CHART_POINTS, refresh=False):
+    """Returns a report's chart series (no figures rendered) from the report cache."""
+    return report_cache.get_or_build(
+        name,
+        lambda: REPORT_BUILDERS[name](output='data', points=points),
+        params={"output": "data", "points": points},
+        refresh=refresh
+    )
+
+
+def report_options():
+    """Reads the /run-* query options that select which variant of a report is built."""
+    return {
+        "output": request.args.get('output', 'images'),
+        "points": request.args.get('points', CHART_POINTS, type=int),
+        "format": request.args.get('format', 'png'),
+        "images": request.args.get('images', 'inline'),
+        "refresh": request.args.get('refresh') == '1',
+    }
+
+
+def generate_report(name, options):
+    """Builds one variant of a report; runs on the job runner, outside any request."""
+    if options['output'] == 'data':
+        return build_report_data(name, options['points'], refresh=options['refresh'])
+
+    result = build_report(name, options['format'], refresh=options['refresh'])
+    if options['images'] == 'url' and 'error' not in result:
+        return image_store.publish(name, options['format'], result)
+    return result
+
+
+def run_report(name):
+    """Queues the report for a /run-* route and returns its job, to be polled at /jobs/<id>.
+
+    ?output=data returns chart series instead of images (?points= caps each
+    ROC/PR curve); ?images=url swaps inline figures for /plots URLs.
+    Identical requests made while a build is in flight share its job.
+    """
+    return submit_report(name, report_options(), label=f"run-{name}")
+
+
+def submit_report(name, options, label):
+    """Queues one variant of a report, sharing the job of any identical build already in flight."""
+    key = (name, tuple(sorted(options.items())))
+    return job_runner.submit(key, lambda: generate_report(name, options), label=label)
+
+
+@app.route('/jobs', methods=['GET'])
+def jobs_stats():
+    """Route to report the report job queue's counters."""
+    return jsonify(job_runner.stats()), 200
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Route to poll a queued report job; carries the report once it is done."""
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown or expired job: {job_id}"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/plots', methods=['GET'])
+def plots_stats():
+    """Route to report which figures the image store currently holds."""
+    return jsonify(image_store.stats()), 200
+
+
+@app.route('/plots/<report>/<path:name>.<any(png, svg):image_format>', methods=['GET'])
+def get_plot(report, name, image_format):
+    """Route to serve one report figure as a cacheable image.
+
+    A report that is not built yet is queued on the job runner (shared with
+    /run-* and other plot requests for it) and answered with 202 and
+    Retry-After until it lands in the report cache.
+    """
+    if report not in REPORT_BUILDERS:
+        return jsonify({"error": f"Unknown report: {report}"}), 404
+    try:
+        result = report_cache.lookup(report, params=report_params(image_format))
+        if result is None:
+            options = {
+                "output": 'images', "points": CHART_POINTS, "format": image_format, "images": 'url', "refresh": False
+            }
+            job = submit_report(report, options, label=f"plots-{report}")
+            response = jsonify(job.to_dict(include_result=False))
+            response.headers['Retry-After'] = str(PLOT_RETRY_AFTER_SECONDS)
+            return response, 202
+        image_store.publish(report, image_format, result)
+        image = image_store.get(report, image_format, name)
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = str(PLOT_RETRY_AFTER_SECONDS)
+        return response, 503
+    except Exception as e:
+        app.logger.error(f"Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+    if image is None:
+        return jsonify({"error": f"Unknown plot: {name}"}), 404
+
+    etag, data = image
+    response = Response(data, mimetype=IMAGE_FORMATS[image_format])
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = PLOT_CACHE_CONTROL
+    return response.make_conditional(request)
+
+
 @app.route('/run-eda', methods=['GET'])
 def run_eda():
-    """Route to execute the EDA pipeline and return results."""
+    """Route to queue the EDA pipeline; poll the returned job for its results."""
+    try:
+        job = run_report('eda')
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        app.logger.error(f"Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/eda/segment', methods=['GET'])
+def eda_segment():
+    """Route to return churn counts and rates per segment of one customer column (?by=, optional ?bins=).
+
+    Only the default segments are kept in the report cache; custom ?bins= are
+    computed per request so clients cannot grow the cache without bound.
+    """
+    by = request.args.get('by', 'Geography')
     try:
-        eda_result = churn_eda()
-        return jsonify(eda_result), 200
+        bins = [float(edge) for edge in request.args['bins'].split(',')] if request.args.get('bins') else None
+        if bins is not None:
+            return jsonify(churn_segment(by, bins)), 200
+        result = report_cache.get_or_build('segment', lambda: churn_segment(by), params={"by": by, "bins": None})
+        return jsonify(result), 200
+    except ValueError as ve:
+        app.logger.error(f"ValueError: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        app.logger.error(f"Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/eda/cube', methods=['GET'])
+def eda_cube():
+    """Route to slice the precomputed churn cube.
+
+    ?group_by=Geography,Gender picks the breakdown (none gives the overall
+    rate); any dimension passed as a parameter, e.g. ?IsActiveMember=1 or
+    ?Age=[18, 30)&Age=[30, 40), filters it to those levels.
+    """
+    group_by = [dimension for dimension in request.args.get('group_by', '').split(',') if dimension]
+    filters = {
+        dimension: request.args.getlist(dimension) for dimension in CUBE_DIMENSIONS if dimension in request.args
+    }
+    try:
+        cube = churn_cube.get()
+        return jsonify({"group_by": group_by, "filters": filters, "rows": cube.query(group_by, filters)}), 200
+    except ValueError as ve:
+        app.logger.error(f"ValueError: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        app.logger.error(f"Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/eda/cube/dimensions', methods=['GET'])
+def eda_cube_dimensions():
+    """Route to list the churn cube's dimensions and the levels each can be filtered on."""
+    try:
+        return jsonify(churn_cube.get().describe()), 200
     except Exception as e:
         app.logger.error(f"Error: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -125,13 +583,15 @@ def run_eda():
 
 @app.route('/run-ml', methods=['GET'])
 def run_ml():
-    """Route to generate and return churn summary results"""
+    """Route to queue churn summary results; poll the returned job for them"""
     try:
-        # Generate the results
-        results = generate_results()
+        # Queue the results (or join an identical build already in flight)
+        job = run_report('ml')
 
-        # Return as JSON response
-        return jsonify(results), 200
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Handle errors and return error message
         app.logger.error(f"Error: {str(e)}")
@@ -140,13 +600,15 @@ def run_ml():
 
 @app.route('/run-dt', methods=['GET'])
 def run_dt():
-    """Route to generate and return DT Modelling results"""
+    """Route to queue DT Modelling results; poll the returned job for them"""
     try:
-        # Generate the results
-        results = generate_dt_plots()
+        # Queue the results (or join an identical build already in flight)
+        job = run_report('dt')
 
-        # Return as JSON response
-        return jsonify(results), 200
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Handle errors and return error message
         app.logger.error(f"Error: {str(e)}")
@@ -154,13 +616,15 @@ def run_dt():
 
 @app.route('/run-lr', methods=['GET'])
 def run_lr():
-    """Route to generate and return LR Modelling results"""
+    """Route to queue LR Modelling results; poll the returned job for them"""
     try:
-        # Generate the results
-        results = generate_lr_plots()
+        # Queue the results (or join an identical build already in flight)
+        job = run_report('lr')
 
-        # Return as JSON response
-        return jsonify(results), 200
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Handle errors and return error message
         app.logger.error(f"Error: {str(e)}")
@@ -168,13 +632,15 @@ def run_lr():
     
 @app.route('/run-rf', methods=['GET'])
 def run_rf():
-    """Route to generate and return RM Modelling results"""
+    """Route to queue RM Modelling results; poll the returned job for them"""
     try:
-        # Generate the results
-        results = generate_rf_plots()
+        # Queue the results (or join an identical build already in flight)
+        job = run_report('rf')
 
-        # Return as JSON response
-        return jsonify(results), 200
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Handle errors and return error message
         app.logger.error(f"Error: {str(e)}")
@@ -182,13 +648,15 @@ def run_rf():
 
 @app.route('/run-xgboost', methods=['GET'])
 def run_xgboost():
-    """Route to generate and return XGBoost Modelling results"""
+    """Route to queue XGBoost Modelling results; poll the returned job for them"""
     try:
-        # Generate the results
-        results = generate_xg_plots()
+        # Queue the results (or join an identical build already in flight)
+        job = run_report('xgboost')
 
-        # Return as JSON response
-        return jsonify(results), 200
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Handle errors and return error message
         app.logger.error(f"Error: {str(e)}")
@@ -196,13 +664,31 @@ def run_xgboost():
     
 @app.route('/run-svm', methods=['GET'])
 def run_svm():
-    """Route to generate and return SVM Modelling results"""
+    """Route to queue SVM Modelling results; poll the returned job for them"""
+    try:
+        # Queue the results (or join an identical build already in flight)
+        job = run_report('svm')
+
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        # Handle errors and return error message
+        app.logger.error(f"Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/run-cv', methods=['GET'])
+def run_cv():
+    """Route to queue stratified k-fold scores of every saved model; poll the returned job for them"""
     try:
-        # Generate the results
-        results = generate_svm_plots()
+        # Queue the evaluation (or join an identical one already in flight)
+        job = run_report('cv')
 
-        # Return as JSON response
-        return jsonify(results), 200
+        # Return the job to poll
+        return jsonify(job.to_dict()), 202
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Handle errors and return error message
         app.logger.error(f"Error: {str(e)}")
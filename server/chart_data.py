@@ -0,0 +1,77 @@
+import os
+import numpy as np
+from sklearn.metrics import (
+    auc, average_precision_score, classification_report, confusion_matrix, precision_recall_curve, roc_curve
+)
+
+# Points kept per ROC/PR curve when a report is returned as data (overridable with ?points=)
+CHART_POINTS = int(os.environ.get('CHART_POINTS', 100))
+
+# Decimal places kept in every data series
+CHART_DECIMALS = 4
+
+CLASS_LABELS = ['Customer did not churn', 'Customer churned']
+
+
+def rounded(values, decimals=CHART_DECIMALS):
+    """Returns values as a plain (nested) list of rounded floats."""
+    return np.round(np.asarray(values, dtype=float), decimals).tolist()
+
+
+def downsample(x, y, points):
+    """Keeps at most points evenly spaced (x, y) pairs, always including both ends of the curve."""
+    if points < 2 or len(x) <= points:
+        return x, y
+    index = np.unique(np.linspace(0, len(x) - 1, points).round().astype(int))
+    return x[index], y[index]
+
+
+def accuracy_series(train_score, test_score):
+    return {"labels": ['Training Data', 'Testing Data'], "values": rounded([train_score * 100, test_score * 100], 2)}
+
+
+def confusion_matrix_series(y_test, predictions, normalize=True, labels=CLASS_LABELS):
+    cm = confusion_matrix(y_test, predictions)
+    if normalize:
+        return {"labels": labels, "matrix": rounded(cm / cm.sum(axis=1)[:, np.newaxis])}
+    return {"labels": labels, "matrix": cm.tolist()}
+
+
+def classification_report_series(y_test, predictions):
+    report = classification_report(y_test, predictions, output_dict=True)
+    metrics = ['precision', 'recall', 'f1-score']
+    return {
+        "metrics": ['Precision', 'Recall', 'F1-Score'],
+        "series": {
+            'Customers who did not churn': rounded([report['0'][metric] for metric in metrics]),
+            'Customers who churn': rounded([report['1'][metric] for metric in metrics]),
+        }
+    }
+
+
+def feature_importance_series(sorted_features, sorted_importance):
+    return {"features": [str(feature) for feature in sorted_features], "values": rounded(sorted_importance, 2)}
+
+
+def roc_curve_series(y_test, probabilities, points=CHART_POINTS):
+    fpr, tpr, _ = roc_curve(y_test, probabilities)
+    roc_auc = auc(fpr, tpr)
+    fpr, tpr = downsample(fpr, tpr, points)
+    return {"x": rounded(fpr), "y": rounded(tpr), "auc": round(float(roc_auc), CHART_DECIMALS)}
+
+
+def precision_recall_series(y_test, probabilities, points=CHART_POINTS):
+    precision, recall, _ = precision_recall_curve(y_test, probabilities)
+    pr_auc = average_precision_score(y_test, probabilities)
+    recall, precision = downsample(recall, precision, points)
+    return {"x": rounded(recall), "y": rounded(precision), "auc": round(float(pr_auc), CHART_DECIMALS)}
+
+
+def category_series(counts):
+    """Returns a pandas Series or DataFrame of per-category values as labels plus value lists."""
+    series = {"categories": [str(category) for category in counts.index]}
+    if counts.ndim == 1:
+        series["values"] = rounded(counts.values, 2)
+    else:
+        series["series"] = {str(column): rounded(counts[column].values, 2) for column in counts.columns}
+    return series
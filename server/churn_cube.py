@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from eda_engine import EDA_CHUNK_SIZE, SEGMENT_BINS
+from utils import CHURN_FILE, dataset_cache
+
+logger = logging.getLogger(__name__)
+
+# Dimensions of the cube; the continuous ones are cut into SEGMENT_BINS
+CUBE_DIMENSIONS = [
+    'Geography', 'Gender', 'NumOfProducts', 'IsActiveMember', 'HasCrCard', 'Age', 'Balance', 'CreditScore'
+]
+CUBE_BINS = {dimension: SEGMENT_BINS[dimension] for dimension in ('Age', 'Balance', 'CreditScore')}
+
+
+class ChurnCube:
+    """Customer and exit counts for every combination of the cube's dimension levels.
+
+    counts and exits are dense int32 arrays with one axis per dimension, so
+    any roll-up or filter is a slice and a sum over a few thousand cells
+    instead of a pass over the raw rows.
+    """
+
+    def __init__(self, dimensions, levels, counts, exits, excluded=0):
+        self.dimensions = list(dimensions)
+        self.levels = levels
+        self.counts = counts
+        self.exits = exits
+        self.excluded = excluded
+        self.build_seconds = None
+
+    @classmethod
+    def build(cls, chunks, dimensions=CUBE_DIMENSIONS, bins=CUBE_BINS, target='Exited'):
+        """Streams chunks once and aggregates them into a cube."""
+        levels = {dimension: {} for dimension in dimensions}
+        cells = {}
+        excluded = 0
+        for chunk in chunks:
+            codes = []
+            valid = np.ones(len(chunk), dtype=bool)
+            for dimension in dimensions:
+                values = chunk[dimension]
+                if dimension in bins:
+                    values = pd.cut(values, bins[dimension], right=False)
+                chunk_codes, uniques = pd.factorize(values, sort=True)
+                # Chunk codes -> cube level ids; the trailing 0 absorbs the -1 of missing values
+                mapping = np.array(
+                    [levels[dimension].setdefault(value, len(levels[dimension])) for value in uniques] + [0],
+                    dtype=np.intp
+                )
+                valid &= chunk_codes >= 0
+                codes.append(mapping[chunk_codes])
+
+            excluded += int((~valid).sum())
+            keys = np.stack(codes, axis=1)[valid]
+            if not len(keys):
+                continue
+            exited = chunk[target].to_numpy()[valid].astype(np.int64)
+            unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            customers = np.bincount(inverse, minlength=len(unique_keys))
+            exits = np.bincount(inverse, weights=exited, minlength=len(unique_keys)).astype(np.int64)
+            for key, count, exit_count in zip(map(tuple, unique_keys), customers, exits):
+                cell = cells.setdefault(key, [0, 0])
+                cell[0] += int(count)
+                cell[1] += int(exit_count)
+
+        # Order every dimension's levels by value, then lay the cells out densely
+        order = {dimension: sorted(levels[dimension], key=levels_sort_key) for dimension in dimensions}
+        position = [
+            np.argsort([levels[dimension][value] for value in order[dimension]]) for dimension in dimensions
+        ]
+        shape = tuple(len(order[dimension]) for dimension in dimensions)
+        counts = np.zeros(shape, dtype=np.int32)
+        exit_counts = np.zeros(shape, dtype=np.int32)
+        for key, (count, exit_count) in cells.items():
+            index = tuple(position[axis][level] for axis, level in enumerate(key))
+            counts[index] = count
+            exit_counts[index] = exit_count
+
+        labels = [[str(value) for value in order[dimension]] for dimension in dimensions]
+        return cls(dimensions, labels, counts, exit_counts, excluded)
+
+    def query(self, group_by=(), filters=None):
+        """Returns customers, exits and churn rate per combination of group_by levels.
+
+        filters maps a dimension to the level labels to keep; every other
+        dimension is rolled up. Combinations without customers are omitted.
+        """
+        group_by = list(group_by)
+        filters = filters or {}
+        unknown = [dimension for dimension in group_by + list(filters) if dimension not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions {unknown}; choose from {self.dimensions}")
+        if len(set(group_by)) != len(group_by):
+            raise ValueError("Each dimension can only be grouped by once")
+
+        index, selected = [], {}
+        for dimension, labels in zip(self.dimensions, self.levels):
+            if dimension in filters:
+                wanted = [str(label) for label in filters[dimension]]
+                missing = [label for label in wanted if label not in labels]
+                if missing:
+                    raise ValueError(f"Unknown {dimension} levels {missing}; choose from {labels}")
+                positions = [labels.index(label) for label in wanted]
+            else:
+                positions = list(range(len(labels)))
+            index.append(positions)
+            selected[dimension] = [labels[position] for position in positions]
+
+        rolled_up = tuple(axis for axis, dimension in enumerate(self.dimensions) if dimension not in group_by)
+        counts = self.counts[np.ix_(*index)].sum(axis=rolled_up, dtype=np.int64)
+        exits = self.exits[np.ix_(*index)].sum(axis=rolled_up, dtype=np.int64)
+
+        # Remaining axes follow the cube's dimension order; present them in group_by order
+        kept = [dimension for dimension in self.dimensions if dimension in group_by]
+        permutation = [kept.index(dimension) for dimension in group_by]
+        counts = counts.transpose(permutation)
+        exits = exits.transpose(permutation)
+
+        rows = []
+        for cell in np.ndindex(counts.shape):
+            customers = int(counts[cell])
+            if not customers:
+                continue
+            row = {dimension: selected[dimension][level] for dimension, level in zip(group_by, cell)}
+            row.update({
+                "customers": customers,
+                "exits": int(exits[cell]),
+                "churn_rate": round(int(exits[cell]) * 100 / customers, 2),
+            })
+            rows.append(row)
+        return rows
+
+    def describe(self):
+        """Returns the cube's dimensions with their levels and its size."""
+        return {
+            "dimensions": dict(zip(self.dimensions, self.levels)),
+            "cells": int(self.counts.size),
+            "customers": int(self.counts.sum(dtype=np.int64)),
+            "excluded": self.excluded,
+            "build_seconds": self.build_seconds,
+        }
+
+
+def levels_sort_key(value):
+    # Intervals sort by their left edge; everything else by its own value
+    return value.left if isinstance(value, pd.Interval) else value
+
+
+class CubeStore:
+    """Holds the churn cube for the current Churn_Modelling data, rebuilding it when the data changes."""
+
+    def __init__(self, name=CHURN_FILE, chunk_size=EDA_CHUNK_SIZE):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.builds = 0
+        self._cube = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Returns the cube, building it first if the dataset changed since the last build."""
+        signature = dataset_cache.signature(self.name)
+        if self._cube is not None and self._signature == signature:
+            return self._cube
+
+        with self._lock:
+            if self._cube is None or self._signature != signature:
+                started = time.perf_counter()
+                cube = ChurnCube.build(dataset_cache.iter_chunks(
+                    self.name, columns=CUBE_DIMENSIONS + ['Exited'], chunk_size=self.chunk_size
+                ))
+                cube.build_seconds = round(time.perf_counter() - started, 4)
+                self._cube, self._signature = cube, signature
+                self.builds += 1
+                logger.info(f"Built churn cube with {cube.counts.size} cells in {cube.build_seconds}s")
+            return self._cube
+
+
+churn_cube = CubeStore()
@@ -0,0 +1,85 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from scoring import build_feature_frame, score_models
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCoalescer:
+    """Collects single-customer requests into micro-batches scored as one matrix.
+
+    Callers submit one row of feature values and block on the returned future.
+    A background thread waits up to max_wait seconds (or until max_batch rows
+    are queued), builds a single frame, runs each model once over it and hands
+    every caller back its own row of predictions.
+    """
+
+    def __init__(self, get_models, max_wait=0.005, max_batch=64, **options):
+        self.get_models = get_models
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.options = options
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='predict-coalescer', daemon=True)
+        self._thread.start()
+
+    def submit(self, values):
+        """Queues one row of feature values and returns a future of its predictions."""
+        future = Future()
+        self._queue.put((values, future))
+        return future
+
+    def _collect(self):
+        # Block for the first request, then gather more until the window closes
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                models = self.get_models()
+                features = build_feature_frame([values for values, _ in batch])
+                predictions = score_models(models, features, **self.options)
+
+                # One bad row fails a model for the whole matrix; isolate it
+                if len(batch) > 1 and any(len(p) < len(models) for p in predictions):
+                    predictions = [
+                        score_models(models, build_feature_frame([values]), **self.options)[0]
+                        for values, _ in batch
+                    ]
+            except Exception as e:
+                logger.error(f"Error in coalesced prediction: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(batch)
+            for (_, future), row_predictions in zip(batch, predictions):
+                future.set_result(row_predictions)
+
+    def stats(self):
+        """Returns batching counters."""
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_wait_seconds": self.max_wait,
+            "max_batch": self.max_batch,
+        }
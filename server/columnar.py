@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import sys
+import numpy as np
+import pandas as pd
+
+# Bump when the bundle layout changes; older bundles are then ignored
+BUNDLE_FORMAT = 1
+
+MANIFEST = 'manifest.json'
+
+
+def bundle_path(csv_path):
+    """Returns where the columnar copy of a CSV lives: Resources/x.csv -> Resources/x.columns/."""
+    return os.path.splitext(csv_path)[0] + '.columns'
+
+
+def write_bundle(df, path, source_signature=None):
+    """Stores a DataFrame as one .npy file per column plus a manifest of names and dtypes.
+
+    Categoricals are stored as integer codes with their categories in the
+    manifest and text as fixed-width unicode, so every column can be
+    memory-mapped. The bundle is written next to path and renamed into place.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for index, (name, column) in enumerate(df.items()):
+        entry = {"name": str(name), "file": f"{index}.npy", "dtype": str(column.dtype)}
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            entry["categories"] = column.cat.categories.tolist()
+            values = column.cat.codes.to_numpy()
+        elif column.dtype == object:
+            values = column.to_numpy().astype(str)
+        else:
+            values = column.to_numpy()
+        np.save(os.path.join(tmp_path, entry["file"]), values, allow_pickle=False)
+        columns.append(entry)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "rows": len(df),
+        "source": list(source_signature) if source_signature else None,
+        "columns": columns,
+    }
+    with open(os.path.join(tmp_path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(path):
+    """Returns the bundle manifest, or None when there is no usable bundle at path."""
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == BUNDLE_FORMAT else None
+
+
+def _column(entry, values):
+    # Rebuild a pandas column from its stored array
+    if entry["dtype"] == 'category':
+        return pd.Categorical.from_codes(values, categories=entry["categories"])
+    if entry["dtype"] == 'object':
+        return values.astype(object)
+    return values
+
+
+def read_bundle(path, columns=None, manifest=None):
+    """Loads a bundle as a DataFrame, memory-mapping only the requested columns."""
+    manifest = manifest or read_manifest(path)
+    entries = {entry["name"]: entry for entry in manifest["columns"]}
+    names = list(columns) if columns is not None else list(entries)
+    missing = [name for name in names if name not in entries]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+
+    data = {}
+    for name in names:
+        values = np.load(os.path.join(path, entries[name]["file"]), mmap_mode='r', allow_pickle=False)
+        data[name] = _column(entries[name], values)
+    return pd.DataFrame(data, copy=False)
+
+
+def iter_bundle(path, columns=None, chunk_size=100_000):
+    """Yields the bundle as DataFrames of at most chunk_size rows, paging columns in from disk."""
+    manifest = read_manifest(path)
+    entries = {entry["name"]: entry for entry in manifest["columns"]}
+    names = list(columns) if columns is not None else list(entries)
+    arrays = {
+        name: np.load(os.path.join(path, entries[name]["file"]), mmap_mode='r', allow_pickle=False)
+        for name in names
+    }
+    for start in range(0, manifest["rows"], chunk_size):
+        data = {name: _column(entries[name], np.array(arrays[name][start:start + chunk_size])) for name in names}
+        yield pd.DataFrame(data, copy=False)
+
+
+def convert(names=None):
+    """Writes the columnar copy of each Resources dataset (all of them by default)."""
+    # Imported here: utils reads bundles through this module
+    from model_registry import file_signature
+    from utils import DATASET_DTYPES, RESOURCES_DIR
+
+    for name in names or DATASET_DTYPES:
+        csv_path = os.path.join(RESOURCES_DIR, name)
+        df = pd.read_csv(csv_path, dtype=DATASET_DTYPES.get(name))
+        write_bundle(df, bundle_path(csv_path), file_signature(csv_path))
+        print(f"{name}: {len(df)} rows, {len(df.columns)} columns -> {bundle_path(csv_path)}")
+
+
+# Usage (from server/): python columnar.py [analytical_base_table.csv Churn_Modelling.csv]
+if __name__ == "__main__":
+    convert(sys.argv[1:])
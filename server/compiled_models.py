@@ -0,0 +1,183 @@
+import logging
+import numpy as np
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from shared_encoding import split_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Leaf marker used by sklearn's tree arrays
+TREE_LEAF = -1
+
+
+def as_object_array(frame):
+    """Returns the rows of a DataFrame (or 2-D sequence) as an object ndarray."""
+    if hasattr(frame, 'to_numpy'):
+        return frame.to_numpy(dtype=object)
+    return np.asarray(frame, dtype=object).reshape(len(frame), -1)
+
+
+class CompiledEncoder:
+    """NumPy version of a fitted MinMaxScaler + OneHotEncoder columntransformer."""
+
+    def __init__(self, preprocessor):
+        self.blocks = []
+        for name, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, str) and transformer == 'drop':
+                continue
+            columns = np.asarray(columns, dtype=np.intp)
+            if isinstance(transformer, MinMaxScaler):
+                if transformer.clip:
+                    raise ValueError("MinMaxScaler(clip=True) is not supported")
+                self.blocks.append(('scale', columns, transformer.scale_.copy(), transformer.min_.copy()))
+            elif isinstance(transformer, OneHotEncoder):
+                if transformer.drop_idx_ is not None or transformer.handle_unknown != 'error':
+                    raise ValueError("Only OneHotEncoder(drop=None, handle_unknown='error') is supported")
+                categories = [np.asarray(c, dtype=object) for c in transformer.categories_]
+                self.blocks.append(('onehot', columns, categories, transformer.dtype))
+            else:
+                raise ValueError(f"Unsupported transformer {name}: {type(transformer).__name__}")
+
+    def transform(self, frame):
+        values = as_object_array(frame)
+        parts = []
+        for kind, columns, first, second in self.blocks:
+            block = values[:, columns]
+            if kind == 'scale':
+                # Same operations, in the same order, as MinMaxScaler.transform
+                scaled = block.astype(np.float64)
+                scaled *= first
+                scaled += second
+                parts.append(scaled)
+            else:
+                for column, categories in zip(block.T, first):
+                    hot = column[:, np.newaxis] == categories[np.newaxis, :]
+                    if not hot.any(axis=1).all():
+                        raise ValueError(f"Found unknown categories during transform: {set(column) - set(categories)}")
+                    parts.append(hot.astype(second))
+        return np.hstack(parts)
+
+
+class CompiledLogisticRegression:
+    """Pure NumPy scorer for a fitted binary LogisticRegression pipeline."""
+
+    def __init__(self, encoder, estimator):
+        if len(estimator.classes_) != 2:
+            raise ValueError("Only binary LogisticRegression is supported")
+        if getattr(estimator, 'multi_class', 'auto') == 'multinomial':
+            raise ValueError("Only one-vs-rest LogisticRegression is supported")
+        self.encoder = encoder
+        self.coef = estimator.coef_.copy()
+        self.intercept = estimator.intercept_.copy()
+        self.classes = estimator.classes_.copy()
+
+    def decision_function(self, frame):
+        # Same expression as LinearClassifierMixin.decision_function
+        return (self.encoder.transform(frame) @ self.coef.T + self.intercept).ravel()
+
+    def predict(self, frame):
+        return self.classes[(self.decision_function(frame) > 0).astype(int)]
+
+    def predict_proba(self, frame):
+        proba = expit(self.decision_function(frame))
+        return np.vstack([1 - proba, proba]).T
+
+
+class CompiledDecisionTree:
+    """Pure NumPy scorer for a fitted single-output DecisionTreeClassifier pipeline."""
+
+    def __init__(self, encoder, estimator):
+        if estimator.n_outputs_ != 1:
+            raise ValueError("Only single-output trees are supported")
+        tree = estimator.tree_
+        self.encoder = encoder
+        self.left = tree.children_left.copy()
+        self.right = tree.children_right.copy()
+        self.feature = tree.feature.copy()
+        self.threshold = tree.threshold.copy()
+        self.value = tree.value[:, 0, :].copy()
+        self.classes = estimator.classes_.copy()
+
+    def apply(self, frame):
+        # sklearn walks the tree on float32 inputs compared against float64 thresholds
+        X = self.encoder.transform(frame).astype(np.float32)
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        while True:
+            active = np.flatnonzero(self.left[node] != TREE_LEAF)
+            if not active.size:
+                return node
+            current = node[active]
+            go_left = X[active, self.feature[current]].astype(np.float64) <= self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+
+    def predict(self, frame):
+        return self.classes.take(np.argmax(self.value[self.apply(frame)], axis=1), axis=0)
+
+    def predict_proba(self, frame):
+        proba = self.value[self.apply(frame)]
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        return proba / normalizer
+
+
+COMPILERS = {
+    LogisticRegression: CompiledLogisticRegression,
+    DecisionTreeClassifier: CompiledDecisionTree,
+}
+
+
+def compile_model(model):
+    """Extracts a saved pipeline's fitted parameters into a NumPy-only scorer.
+
+    Raises ValueError when the pipeline contains steps this module cannot reproduce.
+    """
+    preprocessor, rest = split_pipeline(model)
+    if preprocessor is None:
+        raise ValueError("Model has no columntransformer step")
+
+    steps = getattr(rest, 'steps', [(None, rest)])
+    # Samplers such as SMOTE only act during fit
+    if any(not hasattr(step, 'fit_resample') for _, step in steps[:-1]):
+        raise ValueError("Only samplers may sit between the preprocessor and the estimator")
+
+    estimator = steps[-1][1]
+    compiler = COMPILERS.get(type(estimator))
+    if compiler is None:
+        raise ValueError(f"Unsupported estimator: {type(estimator).__name__}")
+    return compiler(CompiledEncoder(preprocessor), estimator)
+
+
+def verify_compiled(model, compiled, sample):
+    """Checks that the compiled scorer reproduces the pipeline bit for bit on sample."""
+    if not np.array_equal(model.predict(sample), compiled.predict(sample)):
+        return False
+    if hasattr(model, 'predict_proba'):
+        return np.array_equal(model.predict_proba(sample), compiled.predict_proba(sample))
+    return True
+
+
+def compile_models(models, sample):
+    """Swaps every model that can be compiled and verified on sample for its NumPy scorer.
+
+    Models that are unsupported or fail verification are kept as they are.
+    """
+    compiled_models = {}
+    for model_name, model in models.items():
+        try:
+            compiled = compile_model(model)
+            verified = verify_compiled(model, compiled, sample)
+        except Exception as e:
+            logger.info(f"Not compiling {model_name}: {str(e)}")
+            compiled_models[model_name] = model
+            continue
+
+        if verified:
+            logger.info(f"Compiled {model_name} to NumPy")
+            compiled_models[model_name] = compiled
+        else:
+            logger.warning(f"Compiled {model_name} does not match the original pipeline; keeping sklearn")
+            compiled_models[model_name] = model
+    return compiled_models
@@ -0,0 +1,164 @@
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+from sklearn.model_selection import StratifiedKFold
+
+from chart_data import CHART_POINTS, rounded
+from model_registry import MODEL_FILES, registry
+from rendering import worker_context
+from shared_encoding import split_pipeline
+from utils import ABT_FILE, dataset_cache
+
+logger = logging.getLogger(__name__)
+
+# Stratified folds every model is scored on
+CV_FOLDS = int(os.environ.get('CV_FOLDS', 5))
+CV_RANDOM_STATE = 10
+
+# Processes the (model, fold) fits are spread over
+CV_WORKERS = int(os.environ.get('CV_WORKERS', os.cpu_count() or 1))
+
+# Metrics reported per model, all for the churned class where it matters
+CV_METRICS = {
+    'precision': precision_score,
+    'recall': recall_score,
+    'f1': f1_score,
+    'accuracy': accuracy_score,
+}
+
+
+class FoldCache:
+    """Encoded (train, validation) arrays per fold, computed once per preprocessor and dataset.
+
+    Each fold's preprocessor is fitted on that fold's training rows only.
+    Every saved model starts with the same columntransformer configuration,
+    so all of them share one encoding of each fold.
+    """
+
+    def __init__(self):
+        self.encodings = 0
+        self._folds = {}
+        self._lock = threading.Lock()
+
+    def folds(self, preprocessor, X, y, n_splits, data_key):
+        """Returns [(X_train, y_train, X_val, y_val)] for each fold, encoded by a clone of preprocessor."""
+        template = clone(preprocessor) if preprocessor is not None else None
+        key = (joblib.hash(template), data_key, n_splits)
+        with self._lock:
+            cached = self._folds.get(key)
+            if cached is not None:
+                return cached
+
+            folds = []
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=CV_RANDOM_STATE)
+            for train_index, val_index in splitter.split(X, y):
+                X_train, X_val = X[train_index], X[val_index]
+                if template is not None:
+                    encoder = clone(template).fit(X_train)
+                    X_train, X_val = encoder.transform(X_train), encoder.transform(X_val)
+                folds.append((X_train, y[train_index], X_val, y[val_index]))
+            self.encodings += 1
+            # Folds of an older version of the dataset can never be asked for again
+            for stale in [cached_key for cached_key in self._folds if cached_key[1] != data_key]:
+                del self._folds[stale]
+            self._folds[key] = folds
+            return folds
+
+
+fold_cache = FoldCache()
+
+
+def score_fold(estimator, X_train, y_train, X_val, y_val):
+    """Fits an unfitted estimator on one fold's encoded training rows and scores it on the rest."""
+    estimator.fit(X_train, y_train)
+    predictions = estimator.predict(X_val)
+    return {name: float(metric(y_val, predictions)) for name, metric in CV_METRICS.items()}
+
+
+def summarize(fold_scores):
+    """Returns the mean, standard deviation and per-fold values of each metric."""
+    summary = {}
+    for name in CV_METRICS:
+        values = np.array([scores[name] for scores in fold_scores])
+        summary[name] = {
+            "mean": rounded(values.mean()),
+            "std": rounded(values.std(ddof=1) if len(values) > 1 else 0.0),
+            "folds": rounded(values),
+        }
+    return summary
+
+
+def cross_validate(keys=None, n_splits=CV_FOLDS, workers=CV_WORKERS):
+    """Scores every saved model (all registered ones by default) by stratified k-fold cross-validation.
+
+    Each model's pipeline after its columntransformer is cloned and refitted
+    on every fold; the (model, fold) fits run concurrently on a process pool.
+    Models whose artifact is missing or fails are reported with an error.
+    """
+    started = time.perf_counter()
+    df = dataset_cache.load(ABT_FILE)
+    # The saved pipelines select columns by position, as in the notebooks
+    X = df.drop(['Exited'], axis=1).to_numpy()
+    y = df['Exited'].to_numpy()
+    data_key = dataset_cache.signature(ABT_FILE)
+
+    results = {}
+    tasks = {}
+    for key in keys or MODEL_FILES:
+        if not os.path.exists(registry.path(key)):
+            results[key] = {"error": f"No artifact at {MODEL_FILES[key]}"}
+            continue
+        try:
+            preprocessor, estimator = split_pipeline(registry.get(key))
+            tasks[key] = (estimator, fold_cache.folds(preprocessor, X, y, n_splits, data_key))
+        except Exception as e:
+            logger.error(f"Error preparing {key} for cross-validation: {str(e)}")
+            results[key] = {"error": str(e)}
+
+    # Fits are queued on the pool up front; with one worker they run here, one by one
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=worker_context()
+    ) if workers > 1 else None
+    try:
+        pending = {
+            key: [
+                executor.submit(score_fold, clone(estimator), *fold).result if executor is not None
+                else functools.partial(score_fold, clone(estimator), *fold)
+                for fold in folds
+            ]
+            for key, (estimator, folds) in tasks.items()
+        }
+        for key, fold_results in pending.items():
+            try:
+                results[key] = summarize([fold_result() for fold_result in fold_results])
+            except Exception as e:
+                logger.error(f"Error cross-validating {key}: {str(e)}")
+                results[key] = {"error": str(e)}
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "folds": n_splits,
+        "rows": len(y),
+        "metrics": list(CV_METRICS),
+        "models": {key: results[key] for key in keys or MODEL_FILES if key in results},
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def cross_validation_report(output='images', points=CHART_POINTS):
+    """Report builder behind /run-cv; the results are plain numbers in either output mode."""
+    try:
+        return cross_validate()
+    except Exception as e:
+        logger.error(f"Error in cross-validation: {str(e)}")
+        return {"error": str(e)}
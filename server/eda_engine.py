@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Rows read per chunk by the streaming EDA (bounds its memory use)
+EDA_CHUNK_SIZE = int(os.environ.get('EDA_CHUNK_SIZE', 100_000))
+
+# Columns that can be segmented on as they are
+SEGMENT_COLUMNS = ['Geography', 'Gender', 'Tenure', 'NumOfProducts', 'HasCrCard', 'IsActiveMember']
+
+# Default [left, right) bin edges for the continuous columns
+SEGMENT_BINS = {
+    'Age': [18, 30, 40, 50, 60, 70, 100],
+    'Balance': [0, 1, 50_000, 100_000, 150_000, 200_000, 300_000],
+    'CreditScore': [300, 500, 600, 700, 800, 900],
+    'EstimatedSalary': [0, 50_000, 100_000, 150_000, 200_000],
+}
+
+
+def segment_rates(values, exited, bins=None):
+    """Counts stays and exits per segment of values in one vectorized pass.
+
+    values is any column (binned into [left, right) intervals when bins are
+    given) and exited the matching 0/1 target. Returns (segments, counts)
+    where counts[i] holds [stays, exits] for segments[i]; rows outside the
+    bins or with missing values are left out.
+    """
+    if bins is not None:
+        values = pd.cut(values, bins, right=False)
+    codes, segments = pd.factorize(values, sort=True)
+    valid = codes >= 0
+    cells = codes[valid] * 2 + np.asarray(exited)[valid].astype(np.intp)
+    counts = np.bincount(cells, minlength=2 * len(segments)).reshape(-1, 2)
+    return list(segments), counts
+
+
+class ChurnCounts:
+    """Stays/exits counts per category of one column, accumulated chunk by chunk.
+
+    Only one pair of counters per distinct category is kept, so memory is
+    constant in the number of rows fed in.
+    """
+
+    def __init__(self, column, target='Exited', bins=None):
+        self.column = column
+        self.target = target
+        self.bins = bins
+        self.counts = {}
+
+    def update(self, chunk):
+        segments, counts = segment_rates(chunk[self.column], chunk[self.target], self.bins)
+        for segment, (stays, exits) in zip(segments, counts):
+            cell = self.counts.setdefault(segment, [0, 0])
+            cell[0] += int(stays)
+            cell[1] += int(exits)
+
+    def table(self):
+        """Returns (counts, percentages) DataFrames: one row per category, columns Exited 0 and 1."""
+        counts = pd.DataFrame.from_dict(self.counts, orient='index', columns=[0, 1]).sort_index()
+        counts.index.name = self.column
+        counts.columns.name = self.target
+        # Same operations, in the same order, as round(g * 100 / g.sum(), 2) per group
+        percentages = (counts * 100).div(counts.sum(axis=1), axis=0).round(2)
+        return counts, percentages
+
+    def totals(self):
+        """Returns the number of rows per category."""
+        counts, _ = self.table()
+        return counts.sum(axis=1)
+
+
+def churn_tables(chunks, columns, bins=None):
+    """Streams chunks once and returns a ChurnCounts for each of columns (binned per bins[column])."""
+    bins = bins or {}
+    tables = {column: ChurnCounts(column, bins=bins.get(column)) for column in columns}
+    for chunk in chunks:
+        for table in tables.values():
+            table.update(chunk)
+    return tables
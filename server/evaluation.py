@@ -0,0 +1,58 @@
+from functools import partial
+from sklearn.metrics import accuracy_score, f1_score
+
+# Metric behind GridSearchCV.score for the scoring strings the saved searches use
+SCORING_METRICS = {
+    None: accuracy_score,
+    'accuracy': accuracy_score,
+    'f1_macro': partial(f1_score, average='macro'),
+}
+
+
+class EvaluationContext:
+    """Runs inference once per (model, split) and shares the results across metrics and plots.
+
+    Every report metric (score, confusion matrix, classification report, ROC
+    and PR curves) is derived from the cached labels and probabilities instead
+    of calling predict/predict_proba again.
+    """
+
+    def __init__(self, X_train, y_train, X_test, y_test):
+        self.splits = {'train': (X_train, y_train), 'test': (X_test, y_test)}
+        self.inference_calls = 0
+        self._models = {}
+        self._labels = {}
+        self._probabilities = {}
+
+    def y(self, split='test'):
+        return self.splits[split][1]
+
+    def _key(self, model, split):
+        # Keep a reference so the id cannot be reused while cached
+        self._models[id(model)] = model
+        return id(model), split
+
+    def predict(self, model, split='test'):
+        """Returns the model's predicted labels for the split, computing them once."""
+        key = self._key(model, split)
+        if key not in self._labels:
+            self.inference_calls += 1
+            self._labels[key] = model.predict(self.splits[split][0])
+        return self._labels[key]
+
+    def predict_proba(self, model, split='test'):
+        """Returns the model's positive-class probabilities for the split, computing them once."""
+        key = self._key(model, split)
+        if key not in self._probabilities:
+            self.inference_calls += 1
+            self._probabilities[key] = model.predict_proba(self.splits[split][0])[:, 1]
+        return self._probabilities[key]
+
+    def score(self, model, split='test'):
+        """Returns what model.score would for the split, from the cached labels when possible."""
+        scoring = getattr(model, 'scoring', None)
+        metric = SCORING_METRICS.get(scoring) if scoring is None or isinstance(scoring, str) else None
+        if metric is None:
+            self.inference_calls += 1
+            return model.score(*self.splits[split])
+        return metric(self.y(split), self.predict(model, split))
@@ -0,0 +1,77 @@
+import base64
+import binascii
+import hashlib
+import threading
+from urllib.parse import quote
+
+# Media type of every format a report figure can be served in
+IMAGE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# Leading bytes identifying an encoded figure of each format
+IMAGE_SIGNATURES = {'png': (b'\x89PNG',), 'svg': (b'<?xml', b'<svg')}
+
+
+def decode_image(value, image_format):
+    """Returns the image bytes behind a base64 report value, or None when it is not a figure."""
+    if not isinstance(value, str):
+        return None
+    try:
+        data = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return data if data.startswith(IMAGE_SIGNATURES[image_format]) else None
+
+
+class ImageStore:
+    """Holds report figures as raw image bytes so they can be served individually.
+
+    A report result is unpacked once per result object: every figure is
+    decoded, hashed for its ETag and replaced by its /plots URL. Any other
+    value in the report (metrics tables, ...) is left as it is.
+    """
+
+    def __init__(self):
+        self._images = {}
+        self._layouts = {}
+        self._lock = threading.Lock()
+
+    def publish(self, report, image_format, result):
+        """Stores the figures of a report result and returns its layout with URLs in place of images."""
+        key = (report, image_format)
+        with self._lock:
+            published = self._layouts.get(key)
+            if published is not None and published[0] is result:
+                return published[1]
+
+            images = {}
+            layout = self._unpack(report, image_format, result, images, ())
+            # Keep a reference to result so its identity stays meaningful
+            self._images[key] = images
+            self._layouts[key] = (result, layout)
+            return layout
+
+    def _unpack(self, report, image_format, value, images, path):
+        if isinstance(value, dict):
+            return {name: self._unpack(report, image_format, item, images, path + (str(name),))
+                    for name, item in value.items()}
+
+        data = decode_image(value, image_format)
+        if data is None:
+            return value
+        name = '/'.join(path)
+        images[name] = (hashlib.sha256(data).hexdigest()[:32], data)
+        return f"/plots/{report}/{quote(name)}.{image_format}"
+
+    def get(self, report, image_format, name):
+        """Returns (etag, image bytes) for a published figure, or None."""
+        return self._images.get((report, image_format), {}).get(name)
+
+    def stats(self):
+        return {
+            "reports": sorted(f"{report}.{image_format}" for report, image_format in self._images),
+            "images": sum(len(images) for images in self._images.values()),
+            "bytes": sum(len(data) for images in self._images.values() for _, data in images.values()),
+        }
+
+
+image_store = ImageStore()
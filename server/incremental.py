@@ -0,0 +1,298 @@
+import argparse
+import io
+import json
+import logging
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from model_registry import MODEL_FILES, MODELS_DIR, file_version
+from shared_encoding import split_pipeline
+from training import MANIFEST, RANDOM_STATE, new_run, publish
+from utils import ABT_FILE, DATASET_DTYPES, dataset_cache, prepare_data
+
+logger = logging.getLogger(__name__)
+
+# How far into the analytical base table each incrementally updated model has read
+STATE_FILE = os.path.join(MODELS_DIR, 'incremental.json')
+
+# Boosting rounds XGBoost adds per update, trained on the new rows only
+XGB_DELTA_ROUNDS = int(os.environ.get('XGB_DELTA_ROUNDS', 10))
+
+# Appended rows no model can learn from (unparseable, or unknown to the fitted encoder), kept for inspection
+QUARANTINE_FILE = os.path.join(MODELS_DIR, 'incremental_rejected.csv')
+
+INCREMENTAL_MODELS = ['sgd_logistic_regression', 'xgboost']
+
+
+class NotEnoughRows(Exception):
+    """Raised by an update that cannot use the new rows yet; they are read again next time."""
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"file": ABT_FILE, "models": {}}
+
+
+def save_state(state):
+    tmp_path = f"{STATE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def read_delta(path, offset):
+    """Returns (rows appended to the CSV after byte offset, new offset) without reading what came before.
+
+    Only complete lines are taken, so a row still being written is picked
+    up by the next update instead of being parsed half-way. Values are read
+    as text (see parse_rows); lines with too many fields are logged and left out.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        if size < offset:
+            raise ValueError(f"{path} is smaller than when it was last read; retrain with training.py")
+        f.seek(offset)
+        data = f.read()
+
+    complete = data[:data.rfind(b'\n') + 1]
+    if not complete.strip():
+        return None, offset
+    delta = pd.read_csv(
+        io.BytesIO(header + complete), dtype=str, keep_default_na=False, engine='python', on_bad_lines=_skip_line
+    )
+    return delta, offset + len(complete)
+
+
+def _skip_line(fields):
+    logger.warning(f"Skipped a malformed appended line: {','.join(fields)}")
+    return None
+
+
+def parse_rows(delta):
+    """Splits text rows into (rows typed like the dataset, rows with a missing or malformed value)."""
+    dtypes = DATASET_DTYPES[ABT_FILE]
+    bad = pd.Series(False, index=delta.index)
+    columns = {}
+    for column, dtype in dtypes.items():
+        if dtype == 'category':
+            values = delta[column].fillna('').str.strip()
+            bad |= values == ''
+        else:
+            values = pd.to_numeric(delta[column], errors='coerce')
+            bad |= values.isna()
+            if dtype.startswith('int'):
+                bad |= values % 1 != 0
+        columns[column] = values
+    bad |= ~columns['Exited'].isin([0, 1])
+    return pd.DataFrame(columns)[~bad].astype(dtypes), delta[bad]
+
+
+def encodable(preprocess, X):
+    """Returns a mask of the rows the fitted encoder accepts; OneHotEncoder rejects unseen categories."""
+    try:
+        preprocess.transform(X)
+        return np.ones(len(X), dtype=bool)
+    except ValueError:
+        pass
+    # Only when the batch as a whole fails: find the rows responsible
+    mask = np.ones(len(X), dtype=bool)
+    for i in range(len(X)):
+        try:
+            preprocess.transform(X[i:i + 1])
+        except ValueError:
+            mask[i] = False
+    return mask
+
+
+def usable_rows(model, delta):
+    """Returns (X, y, rejected): the rows model can learn from and the text rows it cannot, with why."""
+    rows, unparsed = parse_rows(delta)
+    X = rows.drop(['Exited'], axis=1).to_numpy()
+    preprocess, _ = split_pipeline(model)
+    mask = encodable(preprocess, X) if preprocess is not None and len(X) else np.ones(len(X), dtype=bool)
+    rejected = pd.concat([
+        unparsed.assign(reason='unparseable'),
+        delta.loc[rows.index[~mask]].assign(reason='unknown to the fitted encoder'),
+    ])
+    return X[mask], rows['Exited'].to_numpy()[mask], rejected
+
+
+def quarantine(rejected):
+    """Appends each model's rejected rows to QUARANTINE_FILE, tagged with the model and the reason."""
+    frames = [rows.assign(model=key) for key, rows in rejected.items() if len(rows)]
+    if not frames:
+        return
+    rows = pd.concat(frames)
+    rows.to_csv(QUARANTINE_FILE, mode='a', index=False, header=not os.path.exists(QUARANTINE_FILE))
+    for key, count in rows['model'].value_counts().items():
+        logger.warning(f"{key}: {count} appended rows could not be used; see {QUARANTINE_FILE}")
+
+
+def sgd_model():
+    """Builds the SGD logistic regression the first time, on the served logistic regression's encoder.
+
+    Reusing the fitted columntransformer keeps the encoder's categories fixed;
+    only the classifier behind it learns from new rows.
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+
+    preprocess, _ = split_pipeline(joblib.load(os.path.join(MODELS_DIR, MODEL_FILES['logistic_regression'])))
+    X_train, _, y_train, _, _, _ = prepare_data()
+    classifier = SGDClassifier(loss='log_loss', random_state=RANDOM_STATE)
+    classifier.partial_fit(preprocess.transform(X_train.to_numpy()), y_train, classes=[0, 1])
+    return Pipeline([('columntransformer', preprocess), ('sgdclassifier', classifier)])
+
+
+def update_sgd(model, X, y):
+    """One partial_fit pass of the classifier over the encoded new rows."""
+    preprocess, classifier = model.steps[0][1], model.steps[-1][1]
+    classifier.partial_fit(preprocess.transform(X), y)
+    return model
+
+
+def update_xgboost(model, X, y):
+    """Adds XGB_DELTA_ROUNDS boosting rounds fitted on the new rows to the saved booster.
+
+    The columntransformer and SMOTE steps are left as they are: new rows go
+    through the fitted encoder and are not resampled.
+    """
+    if len(np.unique(y)) < 2:
+        raise NotEnoughRows("the new rows hold a single class; waiting for more")
+    pipeline = getattr(model, 'best_estimator_', model)
+    preprocess, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+    booster = classifier.get_booster()
+    classifier.set_params(n_estimators=XGB_DELTA_ROUNDS)
+    classifier.fit(preprocess.transform(X), y, xgb_model=booster)
+    classifier.set_params(n_estimators=classifier.get_booster().num_boosted_rounds())
+    return model
+
+
+INCREMENTAL_UPDATES = {
+    'sgd_logistic_regression': update_sgd,
+    'xgboost': update_xgboost,
+}
+
+
+def update(keys=None, publish_models=True):
+    """Updates each incremental model (all by default) with the rows appended since its last update.
+
+    A model without a recorded offset starts from the end of the current
+    file, since its artifact was trained on everything in it. Every model
+    that changes is written to a new versioned run and, unless
+    publish_models is False, renamed over the served artifact. Rows a model
+    cannot use, or whose update fails, are quarantined and read past; rows
+    it cannot use *yet* (NotEnoughRows) are read again next time. With
+    publish_models False nothing is recorded, so the next run reads the same rows. Returns the run's manifest,
+    or None when no model changed.
+    """
+    keys = list(keys or INCREMENTAL_MODELS)
+    unknown = [key for key in keys if key not in INCREMENTAL_UPDATES]
+    if unknown:
+        raise ValueError(f"Unknown incremental models {unknown}; choose from {INCREMENTAL_MODELS}")
+
+    path = dataset_cache.path(ABT_FILE)
+    state = load_state()
+    started = time.perf_counter()
+    updated = {}
+    rejected = {}
+    for key in keys:
+        key_started = time.perf_counter()
+        model_state = state["models"].get(key)
+        artifact = os.path.join(MODELS_DIR, MODEL_FILES[key])
+        if model_state is None:
+            state["models"][key] = {"offset": os.path.getsize(path), "rows": 0}
+            if key == 'sgd_logistic_regression' and not os.path.exists(artifact):
+                updated[key] = (sgd_model(), {
+                    "rows": 0, "bootstrap": True, "wall_seconds": round(time.perf_counter() - key_started, 3)
+                })
+            else:
+                logger.info(f"{key}: baseline recorded at byte {state['models'][key]['offset']}")
+            continue
+
+        delta, offset = read_delta(path, model_state["offset"])
+        if delta is None:
+            logger.info(f"{key}: no new rows")
+            continue
+
+        model = joblib.load(artifact)
+        X, y, rejected[key] = usable_rows(model, delta)
+        if len(X):
+            score_before = float((model.predict(X) == y).mean())
+            try:
+                model = INCREMENTAL_UPDATES[key](model, X, y)
+            except NotEnoughRows as e:
+                logger.info(f"{key}: waiting ({str(e)})")
+                del rejected[key]
+                continue
+            except ValueError as e:
+                # Retrying the same rows would fail the same way and hold back every later row
+                logger.error(f"{key}: update failed ({str(e)}); quarantining the new rows")
+                failed = delta.drop(rejected[key].index).assign(reason=f"update failed: {str(e)}")
+                rejected[key] = pd.concat([rejected[key], failed])
+                X = X[:0]
+            else:
+                updated[key] = (model, {
+                    "rows": len(X),
+                    "rows_rejected": len(rejected[key]),
+                    "delta_accuracy_before": round(score_before, 6),
+                    "delta_accuracy_after": round(float((model.predict(X) == y).mean()), 6),
+                    "wall_seconds": round(time.perf_counter() - key_started, 3),
+                })
+        model_state["offset"] = offset
+        model_state["rows"] += len(X)
+        model_state["rejected"] = model_state.get("rejected", 0) + len(rejected[key])
+
+    if not updated:
+        # Like a published run: a dry run neither moves offsets nor quarantines rows
+        if publish_models:
+            quarantine(rejected)
+            save_state(state)
+        return None
+
+    run_id, run_dir = new_run()
+    entries = {}
+    for key, (model, entry) in updated.items():
+        artifact_path = os.path.join(run_dir, MODEL_FILES[key])
+        joblib.dump(model, artifact_path)
+        entry.update({"file": MODEL_FILES[key], "version": file_version(artifact_path), "status": 'done'})
+        state["models"][key]["version"] = entry["version"]
+        entries[key] = entry
+        logger.info(f"{key}: {entry['rows']} new rows -> version {entry['version']}")
+
+    manifest = {
+        "run": run_id,
+        "kind": 'incremental',
+        "data": {"file": ABT_FILE, "signature": dataset_cache.signature(ABT_FILE)},
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "published": publish_models,
+        "models": entries,
+    }
+    with open(os.path.join(run_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    if publish_models:
+        publish(run_dir, entries)
+        # Recorded last, so a failed or unpublished run reads the same rows again next time
+        quarantine(rejected)
+        save_state(state)
+    return manifest
+
+
+# Usage (from server/): python incremental.py [--no-publish] [sgd_logistic_regression xgboost]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update models with the rows appended to the analytical base table.")
+    parser.add_argument('models', nargs='*', help=f"models to update (default: {INCREMENTAL_MODELS})")
+    parser.add_argument('--no-publish', action='store_true', help="only write the versioned run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    update(args.models, publish_models=not args.no_publish)
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue already holds max_queued jobs."""
+
+
+class Job:
+    """One queued unit of work and, once finished, its result or error."""
+
+    def __init__(self, key, label=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.label = label
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def to_dict(self, include_result=True):
+        job = {
+            "id": self.id,
+            "label": self.label,
+            "status": self.status,
+            "status_url": f"/jobs/{self.id}",
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.error is not None:
+            job["error"] = self.error
+        if include_result and self.status == 'done':
+            job["result"] = self.result
+        return job
+
+
+class JobRunner:
+    """Runs slow work (report builds) on a small thread pool behind a bounded queue.
+
+    Submitting returns a Job right away; callers poll it by id. Identical
+    work is single-flighted: while a job for a key is queued or running,
+    submitting the same key returns that job instead of starting another.
+    Finished jobs are kept for ttl seconds so their result can be fetched.
+    """
+
+    def __init__(self, workers=2, max_queued=32, ttl=600):
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.submitted = 0
+        self.shared = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job')
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, function, label=None):
+        """Queues function() under key, or returns the job already queued or running for key."""
+        with self._lock:
+            self._prune()
+            job = self._active.get(key)
+            if job is not None:
+                self.shared += 1
+                return job
+
+            queued = sum(1 for active in self._active.values() if active.status == 'queued')
+            if queued >= self.max_queued:
+                self.rejected += 1
+                raise JobQueueFull(f"Job queue is full ({queued} jobs waiting)")
+
+            job = Job(key, label)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self.submitted += 1
+            self._executor.submit(self._run, job, function)
+            return job
+
+    def _run(self, job, function):
+        job.status = 'running'
+        job.started = time.time()
+        try:
+            job.result = function()
+            # Report builders signal failure with an error dict rather than raising
+            if isinstance(job.result, dict) and 'error' in job.result:
+                job.error = job.result['error']
+                job.status = 'failed'
+            else:
+                job.status = 'done'
+        except Exception as e:
+            logger.error(f"Error in job {job.label or job.id}: {str(e)}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def _prune(self):
+        expired = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if not job.active and job.finished < expired:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Returns the job with this id, or None once unknown or expired."""
+        return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                "submitted": self.submitted,
+                "shared": self.shared,
+                "rejected": self.rejected,
+                "queued": statuses.count('queued'),
+                "running": statuses.count('running'),
+                "done": statuses.count('done'),
+                "failed": statuses.count('failed'),
+                "max_queued": self.max_queued,
+            }
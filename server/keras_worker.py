@@ -0,0 +1,221 @@
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from rendering import worker_context
+from shared_encoding import split_pipeline
+
+logger = logging.getLogger(__name__)
+
+# The saved Keras search (a pipeline ending in a scikeras KerasClassifier)
+KERAS_FILE = 'scikeras.sav'
+
+# TensorFlow thread pools in the worker, kept small so it leaves cores to sklearn and XGBoost
+KERAS_INTRA_OP_THREADS = int(os.environ.get('KERAS_INTRA_OP_THREADS', 1))
+KERAS_INTER_OP_THREADS = int(os.environ.get('KERAS_INTER_OP_THREADS', 1))
+
+# Rows per Keras forward pass; a request's rows always go to the worker in one call
+KERAS_PREDICT_BATCH_SIZE = int(os.environ.get('KERAS_PREDICT_BATCH_SIZE', 1024))
+
+# Deadline per scoring call, and for starting the worker and loading an artifact version into it
+KERAS_TIMEOUT_SECONDS = float(os.environ.get('KERAS_TIMEOUT_SECONDS', 10))
+KERAS_LOAD_TIMEOUT_SECONDS = float(os.environ.get('KERAS_LOAD_TIMEOUT_SECONDS', 120))
+
+# Loaded model in the worker process: (artifact version, preprocessor, Keras model)
+_loaded = None
+
+
+def _start_tensorflow(intra_op_threads, inter_op_threads):
+    # Runs once in the worker; TensorFlow is never imported by the server process itself
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '1'
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def _load(path, version):
+    # Runs in the worker: loads the artifact, or reloads it when asked for another version
+    global _loaded
+    if _loaded is None or _loaded[0] != version:
+        import joblib
+
+        preprocessor, rest = split_pipeline(joblib.load(path))
+        classifier = rest.steps[-1][1] if hasattr(rest, 'steps') else rest
+        _loaded = (version, preprocessor, classifier.model_)
+    return _loaded
+
+
+def _ready(path, version):
+    # Runs in the worker: loads a version without shipping the model back; the pid lets the server stop it
+    _load(path, version)
+    return os.getpid()
+
+
+def _predict_proba(path, version, X, batch_size):
+    # Runs in the worker: scores one batch
+    _, preprocessor, model = _load(path, version)
+    encoded = preprocessor.transform(X) if preprocessor is not None else X
+    # One sigmoid output: the probability that the customer churns
+    return model.predict(encoded, batch_size=batch_size, verbose=0).reshape(-1)
+
+
+class KerasModel:
+    """One version of the saved Keras search, scored in the worker process.
+
+    The registry loads these through KerasWorker.load, so a new artifact is
+    versioned, smoke-tested and swapped in like any other model.
+    """
+
+    def __init__(self, worker, path, version):
+        self.worker = worker
+        self.path = path
+        self.version = version
+
+    def predict_proba(self, frame):
+        return self.worker.predict_proba(self.path, self.version, frame)
+
+    def predict(self, frame):
+        # Thresholded like scikeras does for a single sigmoid output
+        return (self.predict_proba(frame)[:, 1] > 0.5).astype(int)
+
+
+class KerasWorker:
+    """Runs the Keras model in a dedicated worker process, started on first use.
+
+    Importing TensorFlow costs seconds, so neither server startup nor the
+    other models pay for it: the worker imports it when the first artifact
+    is loaded. A frame goes to the worker in one call, which runs it through
+    Keras in KERAS_PREDICT_BATCH_SIZE batches. A worker that dies or misses
+    its deadline is discarded and the next call starts a fresh one. Calls
+    run one at a time, so a deadline only covers the caller's own call; a
+    caller that cannot get the worker within its deadline gives up without
+    touching it.
+    """
+
+    def __init__(self, intra_op_threads=KERAS_INTRA_OP_THREADS, inter_op_threads=KERAS_INTER_OP_THREADS,
+                 batch_size=KERAS_PREDICT_BATCH_SIZE, timeout=KERAS_TIMEOUT_SECONDS,
+                 load_timeout=KERAS_LOAD_TIMEOUT_SECONDS):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self.calls = 0
+        self.rows = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.started = None
+        self._executor = None
+        self._pid = None
+        # Artifact version the current worker process holds, and that process
+        self._loaded_version = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._call_lock = threading.Lock()
+
+    def _worker(self):
+        # A forked server process inherits the executor object but not the threads managing it
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=1,
+                        mp_context=worker_context(),
+                        initializer=_start_tensorflow,
+                        initargs=(self.intra_op_threads, self.inter_op_threads)
+                    )
+                    self._pid = os.getpid()
+                    self._loaded_version = None
+                    self._worker_pid = None
+                    self.started = time.time()
+        return self._executor
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._loaded_version = None
+            worker_pid, self._worker_pid = self._worker_pid, None
+            self.restarts += 1
+        # A call past its deadline keeps the only worker busy, so the process is stopped too
+        if worker_pid is not None:
+            try:
+                os.kill(worker_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self, timeout):
+        # Waiting for another caller's call is not the worker's fault, so it never restarts it
+        if not self._call_lock.acquire(timeout=timeout):
+            raise FutureTimeoutError(f"Keras worker stayed busy with other calls for {timeout}s")
+
+    def _call(self, timeout, function, *args):
+        # Called with _call_lock held, so the call starts running as soon as it is submitted
+        executor = self._worker()
+        try:
+            return executor.submit(function, *args).result(timeout=timeout)
+        except FutureTimeoutError:
+            self.timeouts += 1
+            logger.error(f"Keras worker missed its {timeout}s deadline; restarting it")
+            self._discard(executor)
+            raise
+        except BrokenProcessPool:
+            logger.error("Keras worker died; restarting it")
+            self._discard(executor)
+            raise
+
+    def _prepare(self, path, version):
+        # Starting TensorFlow and loading take far longer than scoring, so they get their own deadline
+        executor = self._worker()
+        if self._loaded_version != version:
+            self._worker_pid = self._call(self.load_timeout, _ready, path, version)
+            if self._executor is executor:
+                self._loaded_version = version
+
+    def load(self, path, version):
+        """Registry loader: loads this artifact version into the worker and returns a model for it.
+
+        Raises when the worker cannot start or load it (TensorFlow or
+        scikeras missing, a corrupt file), so the model is left out.
+        """
+        self._acquire(self.load_timeout)
+        try:
+            self._prepare(path, version)
+        finally:
+            self._call_lock.release()
+        return KerasModel(self, path, version)
+
+    def predict_proba(self, path, version, frame):
+        X = frame.to_numpy() if hasattr(frame, 'to_numpy') else np.asarray(frame)
+        self.calls += 1
+        self.rows += len(X)
+        self._acquire(self.timeout)
+        try:
+            self._prepare(path, version)
+            churn = self._call(self.timeout, _predict_proba, path, version, X, self.batch_size)
+        finally:
+            self._call_lock.release()
+        return np.column_stack([1 - churn, churn])
+
+    def stats(self):
+        return {
+            "started": self.started,
+            "calls": self.calls,
+            "rows": self.rows,
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "batch_size": self.batch_size,
+        }
@@ -0,0 +1,283 @@
+import hashlib
+import logging
+import os
+import resource
+import threading
+import time
+import joblib
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# Artifact file of every saved model, by registry key
+MODEL_FILES = {
+    'decision_tree': 'nate_decision_tree.sav',
+    'logistic_regression': 'nate_logistic_regression.sav',
+    'random_forest': 'nate_random_forest.sav',
+    'svm': 'SVM_model.sav',
+    'svm_nos': 'SVM_model_nos.sav',
+    'svm_s': 'SVM_model_s.sav',
+    'xgboost': 'XGBoost_model.sav',
+    'knn': 'nate_knn.sav',
+    'sgd_logistic_regression': 'sgd_logistic_regression.sav',
+}
+
+# Models whose size is dominated by large arrays (forest nodes, support vectors,
+# stored neighbours). Memory-mapping them read-only lets forked workers share pages.
+MMAP_MODELS = {'random_forest', 'svm', 'svm_nos', 'svm_s', 'knn'}
+
+
+def file_signature(path):
+    """Returns (size, mtime_ns) for path, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_version(path):
+    """Returns a short content hash identifying one artifact version."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def resident_memory_bytes():
+    """Returns the current resident set size of this process (peak RSS if unavailable)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # ru_maxrss is reported in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelRegistry:
+    """Process-wide store that loads each model artifact once, on first use.
+
+    Loaded artifacts can be hot-reloaded: watch() polls the files, loads a
+    changed one in the background, runs the validator on it and only then
+    swaps it in. Callers that already hold the previous object keep using
+    it, so in-flight requests finish on the old version. Replace artifacts
+    by writing a new file and renaming it over the old one; overwriting a
+    memory-mapped file in place changes the pages under the old model.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, model_files=MODEL_FILES, mmap_models=MMAP_MODELS):
+        self.models_dir = models_dir
+        self.model_files = dict(model_files)
+        self.mmap_models = mmap_models
+        self.loaders = {}
+        self.validator = None
+        self.loads = {}
+        self.bytes_read = 0
+        self.load_seconds = {}
+        self.rejected = {}
+        self.failed = {}
+        self._rejected_signatures = {}
+        self._failed_signatures = {}
+        self._models = {}
+        self._versions = {}
+        self._signatures = {}
+        self._pending = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._watcher = None
+        self._watcher_pid = None
+
+    def register(self, key, file_name, loader):
+        """Adds a model whose artifact is opened by loader(path, version) instead of joblib.load.
+
+        It is then loaded, watched, validated and swapped like the rest.
+        """
+        self.model_files[key] = file_name
+        self.loaders[key] = loader
+
+    def path(self, key):
+        return os.path.join(self.models_dir, self.model_files[key])
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key):
+        """Returns the model for key, loading it from disk the first time it is asked for."""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        # One loader per key; concurrent callers wait for it instead of loading twice
+        with self._key_lock(key):
+            model = self._models.get(key)
+            if model is None:
+                try:
+                    model, version, signature = self._load(key)
+                except Exception as e:
+                    # Watched from now on, so the artifact is picked up once it is published
+                    self.failed[key] = str(e)
+                    self._failed_signatures[key] = file_signature(self.path(key))
+                    raise
+                self._swap(key, model, version, signature)
+                self.failed.pop(key, None)
+                self._failed_signatures.pop(key, None)
+            return model
+
+    def version(self, key):
+        """Returns the content version of the currently served artifact for key."""
+        return self._versions.get(key)
+
+    def add_listener(self, listener):
+        """Registers listener(key, version), called after a reloaded model is swapped in."""
+        self._listeners.append(listener)
+
+    def _load(self, key):
+        path = self.path(key)
+        signature = file_signature(path)
+        version = file_version(path)
+        started = time.perf_counter()
+        loader = self.loaders.get(key)
+        if loader is not None:
+            model = loader(path, version)
+        else:
+            model = joblib.load(path, mmap_mode='r' if key in self.mmap_models else None)
+        self.load_seconds[key] = round(time.perf_counter() - started, 4)
+        self.loads[key] = self.loads.get(key, 0) + 1
+        self.bytes_read += os.path.getsize(path)
+        return model, version, signature
+
+    def _swap(self, key, model, version, signature):
+        # A single dict assignment: readers see either the old or the new model
+        with self._lock:
+            self._models[key] = model
+            self._versions[key] = version
+            self._signatures[key] = signature
+
+    def reload(self, key):
+        """Loads key from disk again, validates it and swaps it in. Returns True if swapped."""
+        with self._key_lock(key):
+            try:
+                model, version, signature = self._load(key)
+                if version == self._versions.get(key):
+                    # Touched but unchanged
+                    self._signatures[key] = signature
+                    return False
+                if self.validator is not None:
+                    self.validator(key, model)
+            except Exception as e:
+                self.rejected[key] = str(e)
+                self._rejected_signatures[key] = file_signature(self.path(key))
+                logger.error(f"Rejected new {key} artifact: {str(e)}")
+                return False
+
+            self._swap(key, model, version, signature)
+            self.rejected.pop(key, None)
+            self.failed.pop(key, None)
+            self._failed_signatures.pop(key, None)
+
+        logger.info(f"Swapped in {key} version {version}")
+        for listener in self._listeners:
+            try:
+                listener(key, version)
+            except Exception as e:
+                logger.error(f"Error in model swap listener: {str(e)}")
+        return True
+
+    def check_for_updates(self):
+        """Reloads every artifact whose file changed and has stopped changing.
+
+        Every key is polled. Loaded models are reloaded when their file
+        changes; a model that failed to load is loaded once a new file
+        appears. Keys nobody asked for yet are left to get(), which reads
+        whatever is on disk when they are first needed.
+        """
+        swapped = []
+        for key in self.model_files:
+            if key in self._models:
+                known = self._signatures.get(key)
+            elif key in self._failed_signatures:
+                known = self._failed_signatures[key]
+            else:
+                continue
+            signature = file_signature(self.path(key))
+            if signature is None or signature == known:
+                self._pending.pop(key, None)
+                continue
+            if signature == self._rejected_signatures.get(key):
+                continue
+
+            # Wait for one unchanged poll so a half-copied file is never loaded
+            if self._pending.get(key) != signature:
+                self._pending[key] = signature
+                continue
+
+            del self._pending[key]
+            if self.reload(key):
+                swapped.append(key)
+        return swapped
+
+    def watch(self, interval):
+        """Starts a daemon thread polling the model files every interval seconds, once per process.
+
+        Threads do not survive fork, so a process forked after watch() (a
+        gunicorn --preload worker) starts its own watcher when it calls this.
+        """
+        if interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check_for_updates()
+                except Exception as e:
+                    logger.error(f"Error watching models: {str(e)}")
+
+        self._watcher = threading.Thread(target=poll, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def preload(self, keys=None):
+        """Loads the given models (all by default) up front, e.g. before forking workers."""
+        for key in keys or self.model_files:
+            if os.path.exists(self.path(key)):
+                self.get(key)
+
+    def stats(self):
+        """Returns what is loaded, at which version, how often it was read and current memory use."""
+        return {
+            "loaded": sorted(self._models),
+            "versions": dict(self._versions),
+            "loads": dict(self.loads),
+            "load_seconds": dict(self.load_seconds),
+            "bytes_read": self.bytes_read,
+            "rejected": dict(self.rejected),
+            "failed": dict(self.failed),
+            "memory_mapped": sorted(key for key in self._models if key in self.mmap_models),
+            "resident_memory_bytes": resident_memory_bytes(),
+        }
+
+
+class ServingModels(dict):
+    """A snapshot of served models by display name, with the artifact version behind each."""
+
+    def __init__(self, models, versions):
+        super().__init__(models)
+        self.versions = {name: version for name, version in versions.items() if name in models}
+        self.version = hashlib.sha1(repr(sorted(self.versions.items())).encode()).hexdigest()[:12]
+
+
+# Shared by every route and script in the process
+registry = ModelRegistry()
+
+
+def get_model(key):
+    """Resolves a model through the process-wide registry."""
+    return registry.get(key)
@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import PLOT_FORMAT, plot_format
+
+# Processes rendering report figures; 1 renders in the request thread
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 1))
+
+# How every worker process (figures, cross-validation, Keras) is started. 'fork' would copy
+# the server's threads and locks mid-use, so workers start clean and get their data as arguments.
+RENDER_START_METHOD = os.environ.get(
+    'RENDER_START_METHOD', 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Imported once by the fork server, so its workers start with them loaded; app.py is left out
+WORKER_PRELOAD = ['rendering']
+
+# One independent figure: a module-level plot function and the precomputed data it draws
+FigureJob = namedtuple('FigureJob', ['function', 'args'])
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_context():
+    """Returns the multiprocessing context every worker pool in the server is created with."""
+    context = multiprocessing.get_context(RENDER_START_METHOD)
+    if RENDER_START_METHOD == 'forkserver':
+        context.set_forkserver_preload(WORKER_PRELOAD)
+    return context
+
+
+def render_pool():
+    """Returns the process pool shared by every report, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=RENDER_WORKERS,
+                    mp_context=worker_context()
+                )
+    return _pool
+
+
+def _render(job, image_format):
+    # Workers do not inherit the caller's context, so the format travels with the job
+    with plot_format(image_format):
+        return job.function(*job.args)
+
+
+def _leaves(jobs, path=()):
+    for name, job in jobs.items():
+        if isinstance(job, FigureJob):
+            yield path + (name,), job
+        elif isinstance(job, dict):
+            yield from _leaves(job, path + (name,))
+
+
+def _rebuild(jobs, results, path=()):
+    layout = {}
+    for name, job in jobs.items():
+        if isinstance(job, FigureJob):
+            layout[name] = results[path + (name,)]
+        elif isinstance(job, dict):
+            layout[name] = _rebuild(job, results, path + (name,))
+        else:
+            # Plain values (metrics tables, ...) pass straight through
+            layout[name] = job
+    return layout
+
+
+def render_jobs(jobs):
+    """Renders every FigureJob in a (possibly nested) dict and returns the same layout.
+
+    Jobs are dispatched to the process pool all at once, so independent
+    figures render concurrently; non-job values are copied through unchanged.
+    Figures are encoded in the caller's active plot format.
+    """
+    leaves = list(_leaves(jobs))
+    image_format = PLOT_FORMAT.get()
+    if RENDER_WORKERS <= 1 or len(leaves) <= 1:
+        results = {path: _render(job, image_format) for path, job in leaves}
+        return _rebuild(jobs, results)
+
+    pool = render_pool()
+    futures = {path: pool.submit(_render, job, image_format) for path, job in leaves}
+    results = {path: future.result() for path, future in futures.items()}
+    return _rebuild(jobs, results)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import threading
+
+from model_registry import MODEL_FILES, file_signature, file_version, registry
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(SERVER_DIR, '.report_cache'))
+
+# Bump when the cached JSON layout changes without any input file changing
+CACHE_FORMAT = '1'
+
+ABT = 'Resources/analytical_base_table.csv'
+
+# Code every report is drawn, evaluated, rendered and stored with
+REPORT_CODE = ['utils.py', 'chart_data.py', 'evaluation.py', 'rendering.py', 'image_store.py']
+
+# What each report is built from: dataset files, registry model keys and the
+# source files that draw it (so editing a chart invalidates it too)
+REPORT_INPUTS = {
+    'eda': {
+        'data': ['Resources/Churn_Modelling.csv'],
+        'models': [],
+        'code': ['scripts/churn_eda.py', 'eda_engine.py', *REPORT_CODE],
+    },
+    'segment': {
+        'data': ['Resources/Churn_Modelling.csv'],
+        'models': [],
+        'code': ['scripts/churn_eda.py', 'eda_engine.py', *REPORT_CODE],
+    },
+    'ml': {
+        'data': [ABT],
+        'models': ['decision_tree', 'logistic_regression', 'random_forest', 'svm', 'xgboost', 'svm_nos', 'svm_s'],
+        'code': ['scripts/churning_model.py', *REPORT_CODE],
+    },
+    'dt': {'data': [ABT], 'models': ['decision_tree'], 'code': ['scripts/DT_modelling.py', *REPORT_CODE]},
+    'lr': {'data': [ABT], 'models': ['logistic_regression'], 'code': ['scripts/LR_modelling.py', *REPORT_CODE]},
+    'rf': {'data': [ABT], 'models': ['random_forest'], 'code': ['scripts/RF_modelling.py', *REPORT_CODE]},
+    'xgboost': {'data': [ABT], 'models': ['xgboost'], 'code': ['scripts/XGBoost_modelling.py', *REPORT_CODE]},
+    'svm': {'data': [ABT], 'models': ['svm'], 'code': ['scripts/SVM_modelling.py', *REPORT_CODE]},
+    'cv': {
+        'data': [ABT],
+        'models': list(MODEL_FILES),
+        'code': ['cross_validation.py', 'shared_encoding.py', *REPORT_CODE],
+    },
+}
+
+
+class ReportCache:
+    """Content-addressed, disk-backed cache of generated report JSON.
+
+    A report's key is the hash of every input file behind it, so repeat calls
+    are served from disk (and memory) until a model, dataset or chart source
+    actually changes. Entries survive restarts.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, report_inputs=REPORT_INPUTS):
+        self.cache_dir = cache_dir
+        self.report_inputs = report_inputs
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}
+        self._memory = {}
+
+    def file_hash(self, path):
+        """Returns the content hash of path, re-reading it only when size or mtime change."""
+        signature = file_signature(path)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, file_version(path))
+            self._hashes[path] = cached
+        return cached[1]
+
+    def _model_hash(self, key):
+        path = os.path.join(registry.models_dir, MODEL_FILES[key])
+        if not os.path.exists(path):
+            # Reports that skip a missing model are rebuilt once it appears
+            return 'missing', True
+        digest = self.file_hash(path)
+        served = registry.version(key)
+        # A file the registry has not (yet) swapped in would not match the report built from it
+        return digest, served is None or served == digest
+
+    def key(self, name):
+        """Returns (hash of the report's inputs, whether a result built now may be stored under it)."""
+        inputs = self.report_inputs[name]
+        digest = hashlib.sha256(f"{name}:{CACHE_FORMAT};".encode())
+        storable = True
+        for path in inputs['data'] + inputs['code']:
+            digest.update(f"{path}={self.file_hash(os.path.join(SERVER_DIR, path))};".encode())
+        for model_key in inputs['models']:
+            model_hash, served = self._model_hash(model_key)
+            storable = storable and served
+            digest.update(f"{model_key}={model_hash};".encode())
+        return digest.hexdigest()[:16], storable
+
+    def _variant(self, name, params):
+        # Different options of the same report (e.g. output format) are cached side by side
+        return f"{name}-{hashlib.sha256(json.dumps(params or {}, sort_keys=True).encode()).hexdigest()[:8]}"
+
+    def _cached(self, variant, key, path):
+        cached = self._memory.get(variant)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        if os.path.exists(path):
+            with open(path) as f:
+                result = json.load(f)
+            self._memory[variant] = (key, result)
+            return result
+        return None
+
+    def lookup(self, name, params=None):
+        """Returns the stored report for the current inputs, or None; never builds it."""
+        key, _ = self.key(name)
+        variant = self._variant(name, params)
+        result = self._cached(variant, key, os.path.join(self.cache_dir, f"{variant}-{key}.json"))
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def get_or_build(self, name, build, params=None, refresh=False):
+        """Returns the stored report for the current inputs, building and storing it on a miss."""
+        key, storable = self.key(name)
+        variant = self._variant(name, params)
+        path = os.path.join(self.cache_dir, f"{variant}-{key}.json")
+
+        if not refresh:
+            result = self._cached(variant, key, path)
+            if result is not None:
+                self.hits += 1
+                return result
+
+        self.misses += 1
+        result = build()
+        if storable and not (isinstance(result, dict) and 'error' in result):
+            self._store(variant, key, path, result)
+        return result
+
+    def _store(self, variant, key, path, result):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+        self._memory[variant] = (key, result)
+
+        # Older versions of this report can never be hit again
+        for entry in os.listdir(self.cache_dir):
+            if entry.startswith(f"{variant}-") and entry.endswith('.json') and entry != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry))
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "cache_dir": self.cache_dir}
+
+
+report_cache = ReportCache()
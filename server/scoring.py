@@ -0,0 +1,271 @@
+import csv
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from itertools import islice
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Request keys, in the column order the saved pipelines were trained on
+REQUIRED_KEYS = [
+    'creditScore', 'geography', 'gender', 'age', 'tenure',
+    'balance', 'numofproducts', 'hascrcard', 'isactivemember', 'estimatedsalary'
+]
+
+# Columns of Resources/analytical_base_table.csv without the Exited target
+FEATURE_COLUMNS = [
+    'CreditScore', 'Geography', 'Gender', 'Age', 'Tenure',
+    'Balance', 'NumOfProducts', 'HasCrCard', 'IsActiveMember', 'EstimatedSalary'
+]
+
+FEATURE_DTYPES = {
+    'CreditScore': 'float64',
+    'Geography': 'object',
+    'Gender': 'object',
+    'Age': 'float64',
+    'Tenure': 'float64',
+    'Balance': 'float64',
+    'NumOfProducts': 'int64',
+    'HasCrCard': 'int64',
+    'IsActiveMember': 'int64',
+    'EstimatedSalary': 'float64',
+}
+
+# Lower-cased CSV header -> request key (accepts both request keys and dataset columns)
+CSV_HEADER_KEYS = {key.lower(): key for key in REQUIRED_KEYS}
+
+
+# Function to decode predictions
+def decode(pred):
+    return 'Customer Exits' if pred == 1 else 'Customer Stays'
+
+
+def missing_fields(data):
+    """Returns the required keys that are absent or empty in a customer payload.
+
+    Only missing keys, None and empty strings count; a numeric 0 (no balance,
+    inactive member, ...) is a valid value.
+    """
+    return [key for key in REQUIRED_KEYS if key not in data or data[key] is None or data[key] == '']
+
+
+def parse_features(data):
+    """Converts one customer payload into the ten model input values."""
+    return [
+        float(data['creditScore']),
+        data['geography'],
+        data['gender'],
+        float(data['age']),
+        float(data['tenure']),
+        float(data['balance']),
+        int(data['numofproducts']),
+        int(data['hascrcard']),
+        int(data['isactivemember']),
+        float(data['estimatedsalary']),
+    ]
+
+
+def customer_details(data):
+    """Builds the customer details dictionary echoed back with predictions."""
+    return {
+        "CreditScore": data['creditScore'],
+        "Geography": data['geography'],
+        "Gender": data['gender'],
+        "Age": data['age'],
+        "Tenure": data['tenure'],
+        "Balance": data['balance'],
+        "NumOfProducts": data['numofproducts'],
+        "HasCrCard": "Yes" if str(data['hascrcard']) == "1" else "No",
+        "IsActiveMember": "Yes" if str(data['isactivemember']) == "1" else "No",
+        "EstimatedSalary": data['estimatedsalary']
+    }
+
+
+def validate_customers(records):
+    """Validates a list of customer payloads in one pass.
+
+    Returns the parsed feature rows and a list of per-index errors.
+    """
+    rows = []
+    errors = []
+    for index, data in enumerate(records):
+        if not isinstance(data, dict):
+            errors.append({"index": index, "error": "Customer must be a JSON object"})
+            continue
+
+        missing_keys = missing_fields(data)
+        if missing_keys:
+            errors.append({"index": index, "error": f"Missing fields: {', '.join(missing_keys)}"})
+            continue
+
+        try:
+            rows.append(parse_features(data))
+        except (TypeError, ValueError):
+            errors.append({"index": index, "error": "Invalid input data"})
+    return rows, errors
+
+
+def normalize_csv_record(record):
+    """Maps a CSV row onto request keys, matching headers case-insensitively."""
+    return {
+        CSV_HEADER_KEYS.get(header.strip().lower(), header): value
+        for header, value in record.items()
+        if header is not None
+    }
+
+
+def read_csv_customers(text):
+    """Parses CSV text with a header row into a list of customer payloads."""
+    reader = csv.DictReader(io.StringIO(text))
+    return [normalize_csv_record(record) for record in reader]
+
+
+def iter_ndjson_customers(stream):
+    """Yields customer payloads from a binary stream of newline-delimited JSON."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # Left for validate_customers to report against this row
+            yield None
+
+
+def iter_csv_customers(stream):
+    """Yields customer payloads from a binary stream of CSV with a header row."""
+    lines = (line.decode('utf-8') for line in stream)
+    for record in csv.DictReader(lines):
+        yield normalize_csv_record(record)
+
+
+def iter_chunks(iterable, size):
+    """Yields lists of at most size items without materializing the iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build_feature_frame(rows):
+    """Builds one typed DataFrame from parsed feature rows."""
+    frame = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    return frame.astype(FEATURE_DTYPES)
+
+
+# Predict calls that missed their deadline but are still running, by model name
+_stragglers = {}
+_stragglers_lock = threading.Lock()
+
+
+def predict_models(models, frame, executor=None, timeout=None, model_timeouts=None):
+    """Runs each model's predict over the frame and yields (model_name, labels, error).
+
+    Without an executor the models run one after another. With one, they are all
+    submitted at once and each is given its own deadline (model_timeouts[name],
+    falling back to timeout) measured from submission; a model that misses it
+    yields a FutureTimeoutError instead of holding up the others.
+
+    A running call cannot be stopped, so a model that missed its deadline
+    keeps its executor thread until it finishes. Until then the model is not
+    submitted again and times out straight away, so a slow model cannot fill
+    the pool and delay every other model queued behind it.
+    """
+    if executor is None:
+        for model_name, model in models.items():
+            try:
+                yield model_name, model.predict(frame), None
+            except Exception as e:
+                yield model_name, None, e
+        return
+
+    started = time.monotonic()
+    futures = {}
+    with _stragglers_lock:
+        for model_name, model in models.items():
+            straggler = _stragglers.get(model_name)
+            if straggler is not None and not straggler.done():
+                futures[model_name] = None
+                continue
+            _stragglers.pop(model_name, None)
+            futures[model_name] = executor.submit(model.predict, frame)
+
+    for model_name, future in futures.items():
+        if future is None:
+            yield model_name, None, FutureTimeoutError(f"{model_name} is still running an earlier call")
+            continue
+        limit = (model_timeouts or {}).get(model_name, timeout)
+        remaining = None if limit is None else max(0.0, started + limit - time.monotonic())
+        try:
+            yield model_name, future.result(timeout=remaining), None
+        except FutureTimeoutError as e:
+            # Only a call that has not started yet can be dropped; a running one is left to finish
+            if not future.cancel():
+                with _stragglers_lock:
+                    _stragglers[model_name] = future
+            yield model_name, None, e
+        except Exception as e:
+            yield model_name, None, e
+
+
+def score_models(models, frame, **options):
+    """Runs each model's predict once over the whole frame.
+
+    Returns one list of {"model", "prediction"} entries per row of the frame,
+    with the model "version" added when models carries a versions mapping.
+    Options are passed to predict_models to fan the models out in parallel.
+    """
+    versions = getattr(models, 'versions', {})
+    predictions = [[] for _ in range(len(frame))]
+    for model_name, labels, error in predict_models(models, frame, **options):
+        if isinstance(error, FutureTimeoutError):
+            logger.warning(f"{model_name} timed out")
+            for row_predictions in predictions:
+                row_predictions.append({"model": model_name, "prediction": "Timed out", "timed_out": True})
+            continue
+        if error is not None:
+            logger.error(f"Error: {str(error)}")
+            continue
+
+        entry = {"version": versions[model_name]} if model_name in versions else {}
+        for row_predictions, label in zip(predictions, labels):
+            row_predictions.append({"model": model_name, "prediction": decode(label), **entry})
+    return predictions
+
+
+def stream_predictions(models, records, chunk_size, **options):
+    """Scores customer payloads in fixed-size chunks, yielding one NDJSON line per row.
+
+    Only one chunk is held in memory at a time, however long the input is.
+    Options are passed through to score_models.
+    """
+    offset = 0
+    try:
+        for chunk in iter_chunks(records, chunk_size):
+            rows, errors = validate_customers(chunk)
+            failed = {error["index"]: error["error"] for error in errors}
+            predictions = iter(score_models(models, build_feature_frame(rows), **options) if rows else [])
+
+            for index, data in enumerate(chunk):
+                if index in failed:
+                    result = {"index": offset + index, "error": failed[index]}
+                else:
+                    result = {
+                        "index": offset + index,
+                        "customer": customer_details(data),
+                        "predictions": next(predictions)
+                    }
+                yield json.dumps(result) + '\n'
+            offset += len(chunk)
+    except UnicodeDecodeError:
+        yield json.dumps({"index": offset, "error": "Input must be UTF-8 encoded"}) + '\n'
+    except csv.Error as e:
+        # Malformed CSV (a NUL byte, an oversized field): end the stream with an error line, not a cut
+        yield json.dumps({"index": offset, "error": f"Invalid CSV: {str(e)}"}) + '\n'
@@ -3,8 +3,6 @@ import io
 import numpy as np
 from matplotlib import pyplot as plt
 import seaborn as sns
-import joblib
-import os
 import json
 from sklearn.metrics import (
     confusion_matrix,
@@ -15,6 +13,13 @@ from sklearn.metrics import (
     average_precision_score,
 )
 from utils import encode_plot_to_base64, prepare_data   # Ensure you have the prepare_data function ready
+from model_registry import get_model
+from chart_data import (
+    CHART_POINTS, accuracy_series, classification_report_series, confusion_matrix_series,
+    feature_importance_series, precision_recall_series, roc_curve_series
+)
+from evaluation import EvaluationContext
+from rendering import FigureJob, render_jobs
 
 # Matplotlib non-interactive backend
 import matplotlib
@@ -22,8 +27,8 @@ matplotlib.use('Agg')
 plt.ioff()  # Disable interactive plotting
 
 # Function to plot and return base64
-def plot_model_accuracy(model, X_train, y_train, X_test, y_test):
-    scores = [model.score(X_train, y_train) * 100, model.score(X_test, y_test) * 100]
+def plot_model_accuracy(train_score, test_score):
+    scores = [train_score * 100, test_score * 100]
     labels = ['Training Data', 'Testing Data']
     
     fig = plt.figure(figsize=(6, 2))
@@ -38,8 +43,7 @@ def plot_model_accuracy(model, X_train, y_train, X_test, y_test):
     plt.close(fig)
     return encoded
 
-def plot_normalized_confusion_matrix(model, X_test, y_test):
-    predictions = model.predict(X_test)
+def plot_normalized_confusion_matrix(y_test, predictions):
     cm = confusion_matrix(y_test, predictions)
     cm = np.around(cm / cm.sum(axis=1)[:, np.newaxis], 2)
     
@@ -62,8 +66,7 @@ def plot_normalized_confusion_matrix(model, X_test, y_test):
     plt.close(fig)
     return encoded
 
-def plot_classification_report(model, X_test, y_test):
-    predictions = model.predict(X_test)
+def plot_classification_report(y_test, predictions):
     report = classification_report(y_test, predictions, output_dict=True)
     metrics = ['Precision', 'Recall', 'F1-Score']
     
@@ -91,7 +94,7 @@ def plot_classification_report(model, X_test, y_test):
     plt.close(fig)
     return encoded
 
-def plot_feature_importance(model, num_columns, cat_columns, X_train):
+def feature_importance(model, num_columns, cat_columns):
     pipeline = model.best_estimator_
     preprocessor = pipeline.named_steps['columntransformer']
     rf_model = pipeline.named_steps['randomforestclassifier']
@@ -106,7 +109,9 @@ def plot_feature_importance(model, num_columns, cat_columns, X_train):
     sorted_idx = np.argsort(importance)[::-1]
     sorted_features = all_feature_names[sorted_idx]
     sorted_importance = importance[sorted_idx]
-    
+    return sorted_features, sorted_importance
+
+def plot_feature_importance(sorted_features, sorted_importance):
     fig = plt.figure(figsize=(12, 8))
     plt.bar(sorted_features, sorted_importance, color='#0339A6')
     plt.xlabel("Features")
@@ -119,8 +124,8 @@ def plot_feature_importance(model, num_columns, cat_columns, X_train):
     plt.close(fig)
     return encoded
 
-def plot_roc_curve(model, X_test, y_test):
-    fpr, tpr, thresholds = roc_curve(y_test, model.predict_proba(X_test)[:, 1])
+def plot_roc_curve(y_test, probabilities):
+    fpr, tpr, thresholds = roc_curve(y_test, probabilities)
     roc_auc = auc(fpr, tpr)
     
     fig = plt.figure(figsize=(8, 6))
@@ -137,9 +142,9 @@ def plot_roc_curve(model, X_test, y_test):
     plt.close(fig)
     return encoded
 
-def plot_precision_recall_curve(model, X_test, y_test):
-    precision, recall, _ = precision_recall_curve(y_test, model.predict_proba(X_test)[:, 1])
-    pr_auc = average_precision_score(y_test, model.predict_proba(X_test)[:, 1])
+def plot_precision_recall_curve(y_test, probabilities):
+    precision, recall, _ = precision_recall_curve(y_test, probabilities)
+    pr_auc = average_precision_score(y_test, probabilities)
     
     fig = plt.figure(figsize=(8, 6))
     plt.plot(recall, precision, color='#0339A6', lw=2, label='PR curve (AUC = %0.2f)' % pr_auc)
@@ -153,20 +158,36 @@ def plot_precision_recall_curve(model, X_test, y_test):
     return encoded
 
 # Main function to generate all plots and return JSON
-def generate_rf_plots():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    model = joblib.load(os.path.join(script_dir, '../models/nate_random_forest.sav'))
+def generate_rf_plots(output='images', points=CHART_POINTS):
+    model = get_model('random_forest')
 
     X_train, X_test, y_train, y_test, num_columns, cat_columns = prepare_data()
 
-    plots = {
-        "accuracy_plot": plot_model_accuracy(model, X_train, y_train, X_test, y_test),
-        "confusion_matrix": plot_normalized_confusion_matrix(model, X_test, y_test),
-        "classification_report": plot_classification_report(model, X_test, y_test),
-        "feature_importance": plot_feature_importance(model, num_columns, cat_columns, X_train),
-        "roc_curve": plot_roc_curve(model, X_test, y_test),
-        "precision_recall_curve": plot_precision_recall_curve(model, X_test, y_test)
-    }
+    # One inference pass per split, shared by every plot
+    context = EvaluationContext(X_train, y_train, X_test, y_test)
+    predictions = context.predict(model)
+    train_score, test_score = context.score(model, 'train'), context.score(model, 'test')
+
+    if output == 'data':
+        # Plain chart series for the client to draw; nothing is rendered
+        return {
+            "accuracy_plot": accuracy_series(train_score, test_score),
+            "confusion_matrix": confusion_matrix_series(y_test, predictions),
+            "classification_report": classification_report_series(y_test, predictions),
+            "feature_importance": feature_importance_series(*feature_importance(model, num_columns, cat_columns)),
+            "roc_curve": roc_curve_series(y_test, context.predict_proba(model), points),
+            "precision_recall_curve": precision_recall_series(y_test, context.predict_proba(model), points)
+        }
+
+    # Each figure is an independent job rendered in the process pool
+    plots = render_jobs({
+        "accuracy_plot": FigureJob(plot_model_accuracy, (train_score, test_score)),
+        "confusion_matrix": FigureJob(plot_normalized_confusion_matrix, (y_test, predictions)),
+        "classification_report": FigureJob(plot_classification_report, (y_test, predictions)),
+        "feature_importance": FigureJob(plot_feature_importance, feature_importance(model, num_columns, cat_columns)),
+        "roc_curve": FigureJob(plot_roc_curve, (y_test, context.predict_proba(model))),
+        "precision_recall_curve": FigureJob(plot_precision_recall_curve, (y_test, context.predict_proba(model)))
+    })
     return plots
 
 if __name__ == "__main__":
@@ -3,14 +3,16 @@ import io
 import numpy as np
 from matplotlib import pyplot as plt
 import seaborn as sns
-import joblib
-import os
 import json
 from sklearn.metrics import (
     confusion_matrix,
     classification_report,
 )
 from utils import encode_plot_to_base64, prepare_data   # Ensure you have the prepare_data function ready
+from model_registry import get_model
+from chart_data import CHART_POINTS, accuracy_series, classification_report_series, confusion_matrix_series
+from evaluation import EvaluationContext
+from rendering import FigureJob, render_jobs
 
 # Matplotlib non-interactive backend
 import matplotlib
@@ -18,8 +20,8 @@ matplotlib.use('Agg')
 plt.ioff()  # Disable interactive plotting
 
 # Function to plot and return base64
-def plot_model_accuracy(model, X_train, y_train, X_test, y_test):
-    scores = [model.score(X_train, y_train) * 100, model.score(X_test, y_test) * 100]
+def plot_model_accuracy(train_score, test_score):
+    scores = [train_score * 100, test_score * 100]
     labels = ['Training Data', 'Testing Data']
     
     fig = plt.figure(figsize=(6, 2))
@@ -34,8 +36,7 @@ def plot_model_accuracy(model, X_train, y_train, X_test, y_test):
     plt.close(fig)
     return encoded
 
-def plot_normalized_confusion_matrix(model, X_test, y_test):
-    predictions = model.predict(X_test)
+def plot_normalized_confusion_matrix(y_test, predictions):
     cm = confusion_matrix(y_test, predictions)
     cm = np.around(cm / cm.sum(axis=1)[:, np.newaxis], 2)
     
@@ -58,8 +59,7 @@ def plot_normalized_confusion_matrix(model, X_test, y_test):
     plt.close(fig)
     return encoded
 
-def plot_classification_report(model, X_test, y_test):
-    predictions = model.predict(X_test)
+def plot_classification_report(y_test, predictions):
     report = classification_report(y_test, predictions, output_dict=True)
     metrics = ['Precision', 'Recall', 'F1-Score']
     
@@ -88,17 +88,30 @@ def plot_classification_report(model, X_test, y_test):
     return encoded
 
 # Main function to generate all plots and return JSON
-def generate_svm_plots():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    model = joblib.load(os.path.join(script_dir, '../models/SVM_model.sav'))
+def generate_svm_plots(output='images', points=CHART_POINTS):
+    model = get_model('svm')
 
     X_train, X_test, y_train, y_test, num_columns, cat_columns = prepare_data()
 
-    plots = {
-        "accuracy_plot": plot_model_accuracy(model, X_train, y_train, X_test, y_test),
-        "confusion_matrix": plot_normalized_confusion_matrix(model, X_test, y_test),
-        "classification_report": plot_classification_report(model, X_test, y_test),
-    }
+    # One inference pass per split, shared by every plot
+    context = EvaluationContext(X_train, y_train, X_test, y_test)
+    predictions = context.predict(model)
+    train_score, test_score = context.score(model, 'train'), context.score(model, 'test')
+
+    if output == 'data':
+        # Plain chart series for the client to draw; nothing is rendered
+        return {
+            "accuracy_plot": accuracy_series(train_score, test_score),
+            "confusion_matrix": confusion_matrix_series(y_test, predictions),
+            "classification_report": classification_report_series(y_test, predictions),
+        }
+
+    # Each figure is an independent job rendered in the process pool
+    plots = render_jobs({
+        "accuracy_plot": FigureJob(plot_model_accuracy, (train_score, test_score)),
+        "confusion_matrix": FigureJob(plot_normalized_confusion_matrix, (y_test, predictions)),
+        "classification_report": FigureJob(plot_classification_report, (y_test, predictions)),
+    })
     return plots
 
 if __name__ == "__main__":
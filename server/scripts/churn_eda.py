@@ -1,11 +1,8 @@
 import base64
-import io
-import pandas as pd
-import numpy as np
 from matplotlib import pyplot as plt
-import seaborn as sns
-from collections import Counter
-import os
+from utils import CHURN_FILE, dataset_cache, encode_figure
+from chart_data import CHART_POINTS, category_series
+from eda_engine import EDA_CHUNK_SIZE, SEGMENT_BINS, SEGMENT_COLUMNS, churn_tables
 
 # Use non-interactive matplotlib backend
 import matplotlib
@@ -14,43 +11,18 @@ matplotlib.use('Agg')
 # Disable interactive mode to prevent pop-ups
 plt.ioff()
 
+# The only columns the EDA reads
+EDA_COLUMNS = ['Gender', 'Geography', 'Exited']
+
 def encode_plot_to_base64():
     """Encodes the current plot as a base64 string."""
-    img = io.BytesIO()
-    plt.savefig(img, format='png')
+    encoded = base64.b64encode(encode_figure(plt.gcf())).decode()
     plt.close()
-    img.seek(0)
-    return base64.b64encode(img.getvalue()).decode()
-
-def preprocess_data(df):
-    # Convert 'Gender' to numeric
-    df['Gender'] = df['Gender'].map({'Male': 1, 'Female': 0})
-
-    # One-hot encode 'Geography'
-    geography_dummies = pd.get_dummies(df['Geography'], prefix='Geography')
-    df = pd.concat([df, geography_dummies], axis=1)
-    df.drop(['Geography'], axis=1, inplace=True)
-    
-    return df
+    return encoded
 
-def plot_churn_risk_by_gender(df):
+def plot_churn_risk_by_gender(counts, percentages):
     """Generate Churn Risk per Gender (Count and Percentage) plots."""
     try:
-        # Ensure 'Gender' column is present
-        if 'Gender' not in df or 'Exited' not in df:
-            raise ValueError("'Gender' or 'Exited' column is missing from the dataset.")
-        
-        # Map gender numeric values to labels
-        gender_map = {1: 'Male', 0: 'Female'}
-        df['GenderLabel'] = df['Gender'].map(gender_map)
-        
-        # Count and percentage of churn by gender
-        grouped = df.groupby('GenderLabel')['Exited'].agg(Count='value_counts')
-        counts = grouped.pivot_table(values='Count', index='GenderLabel', columns='Exited', fill_value=0)
-        percentages = grouped.groupby(level=0).apply(lambda g: round(g * 100 / g.sum(), 2)).pivot_table(
-            values='Count', index='GenderLabel', columns='Exited', fill_value=0
-        )
-
         labels = ['Stays', 'Exits']
 
         # Plot count and percentage
@@ -71,28 +43,9 @@ def plot_churn_risk_by_gender(df):
     except Exception as e:
         raise ValueError(f"Error generating churn risk by gender plot: {str(e)}")
 
-def plot_churn_risk_by_geography(df):
+def plot_churn_risk_by_geography(counts, percentages):
     """Generate Churn Risk per Geography (Count and Percentage) plots."""
     try:
-        # Debug: Print column names to identify the issue
-        print("Columns in the DataFrame:", df.columns)
-
-        # Reconstruct 'Geography' if one-hot encoded columns are present
-        geography_cols = [col for col in df.columns if col.startswith('Geography_')]
-        if geography_cols and 'Geography' not in df:
-            df['Geography'] = df[geography_cols].idxmax(axis=1).str.replace('Geography_', '')
-
-        # Ensure 'Geography' column exists
-        if 'Geography' not in df or 'Exited' not in df:
-            raise ValueError("'Geography' or 'Exited' column is missing from the dataset.")
-        
-        # Count and percentage of churn by geography
-        grouped = df.groupby('Geography')['Exited'].agg(Count='value_counts')
-        counts = grouped.pivot_table(values='Count', index='Geography', columns='Exited', fill_value=0)
-        percentages = grouped.groupby(level=0).apply(lambda g: round(g * 100 / g.sum(), 2)).pivot_table(
-            values='Count', index='Geography', columns='Exited', fill_value=0
-        )
-
         labels = ['Stays', 'Exits']
 
         # Plot count and percentage
@@ -113,18 +66,53 @@ def plot_churn_risk_by_geography(df):
     except Exception as e:
         raise ValueError(f"Error generating churn risk by geography plot: {str(e)}")
 
-def churn_eda():
+def churn_risk_series(counts, percentages):
+    """Returns churn counts and percentages per category as plain series."""
+    labels = {0: 'Stays', 1: 'Exits'}
+    return {
+        "count": category_series(counts.rename(columns=labels)),
+        "percentage": category_series(percentages.rename(columns=labels)),
+    }
+
+def churn_segment(by, bins=None):
+    """Returns stays/exits counts and churn percentages per segment of one column.
+
+    Continuous columns are cut into SEGMENT_BINS unless other bin edges are given.
+    """
+    if by not in SEGMENT_COLUMNS and by not in SEGMENT_BINS:
+        raise ValueError(f"Cannot segment by '{by}'; choose one of {SEGMENT_COLUMNS + list(SEGMENT_BINS)}")
+    if bins is not None:
+        if by not in SEGMENT_BINS:
+            raise ValueError(f"Bins only apply to the continuous columns {list(SEGMENT_BINS)}, not '{by}'")
+        if len(bins) < 2 or any(left >= right for left, right in zip(bins, bins[1:])):
+            raise ValueError("Bin edges must be at least two strictly increasing numbers")
+    bins = bins or SEGMENT_BINS.get(by)
+
+    tables = churn_tables(
+        dataset_cache.iter_chunks(CHURN_FILE, columns=[by, 'Exited'], chunk_size=EDA_CHUNK_SIZE),
+        [by],
+        {by: bins}
+    )
+    return {"by": by, "bins": bins, **churn_risk_series(*tables[by].table())}
+
+def churn_eda(output='images', points=CHART_POINTS):
     try:
-        # Load dataset
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, '../Resources/Churn_Modelling.csv')
-        df = pd.read_csv(file_path)
-
-        # Drop unused features
-        df.drop(['RowNumber', 'CustomerId', 'Surname'], axis=1, inplace=True)
-
-        # Preprocess data
-        df = preprocess_data(df)
+        # Stream the table once, keeping only stays/exits counts per gender and geography
+        tables = churn_tables(
+            dataset_cache.iter_chunks(CHURN_FILE, columns=EDA_COLUMNS, chunk_size=EDA_CHUNK_SIZE),
+            ['Gender', 'Geography']
+        )
+        gender_totals = tables['Gender'].totals().sort_values(ascending=False)
+        geography_totals = tables['Geography'].totals()
+
+        if output == 'data':
+            # Plain chart series for the client to draw; nothing is rendered
+            return {
+                "gender_distribution": category_series(gender_totals),
+                "geography_distribution": category_series(geography_totals),
+                "churn_risk_by_gender": churn_risk_series(*tables['Gender'].table()),
+                "churn_risk_by_geography": churn_risk_series(*tables['Geography'].table()),
+            }
 
         # Generate histogram grid
         # hist_plot = io.BytesIO()
@@ -134,28 +122,19 @@ def churn_eda():
         # hist_plot.seek(0)
         # hist_base64 = base64.b64encode(hist_plot.getvalue()).decode()
 
-        # Generate gender distribution plot
-        gender_plot = io.BytesIO()
-        df['Gender'].value_counts().plot.bar(color=['b', 'g'])
+        # Generate gender distribution plot (Gender encoded as Male=1, Female=0)
+        gender_totals.rename({'Male': 1, 'Female': 0}).plot.bar(color=['b', 'g'])
         plt.ylabel('Count')
         plt.xlabel('Gender')
         plt.xticks(ticks=[0, 1], labels=['Female', 'Male'], rotation=0)
-        plt.savefig(gender_plot, format="png")
-        plt.close()
-        gender_plot.seek(0)
-        gender_base64 = base64.b64encode(gender_plot.getvalue()).decode()
+        gender_base64 = encode_plot_to_base64()
 
         # Generate geography distribution plot
-        geography_plot = io.BytesIO()
-        geography_cols = [col for col in df.columns if col.startswith('Geography_')]
-        df[geography_cols].sum().plot.bar(color=['b', 'g', 'r'])
+        geography_totals.rename(lambda geography: f"Geography_{geography}").plot.bar(color=['b', 'g', 'r'])
         plt.ylabel('Count')
         plt.xlabel('Geography')
         plt.xticks(rotation=0)
-        plt.savefig(geography_plot, format="png")
-        plt.close()
-        geography_plot.seek(0)
-        geography_base64 = base64.b64encode(geography_plot.getvalue()).decode()
+        geography_base64 = encode_plot_to_base64()
 
         # Correlation heatmap
         # correlations = df.corr()
@@ -167,8 +146,8 @@ def churn_eda():
         # corr_plot.seek(0)
         # corr_base64 = base64.b64encode(corr_plot.getvalue()).decode()
 
-        gender_risk_plot = plot_churn_risk_by_gender(df)
-        geography_risk_plot = plot_churn_risk_by_geography(df)
+        gender_risk_plot = plot_churn_risk_by_gender(*tables['Gender'].table())
+        geography_risk_plot = plot_churn_risk_by_geography(*tables['Geography'].table())
 
 
         # Return JSON response with plots
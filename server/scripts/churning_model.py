@@ -1,13 +1,9 @@
 import base64
-import io
 import pandas as pd
 import numpy as np
 from matplotlib import pyplot as plt
 import seaborn as sns
 from sklearn.metrics import confusion_matrix, classification_report, accuracy_score, f1_score, precision_score, recall_score
-import joblib
-import os
-from sklearn.model_selection import train_test_split
 
 # Matplotlib non-interactive backend
 import matplotlib
@@ -15,15 +11,11 @@ matplotlib.use('Agg')
 
 plt.ioff()  # Disable interactive plotting
 
-# Load saved models
-models_dir = "models"
-dt_model = joblib.load(os.path.join(models_dir, 'nate_decision_tree.sav'))
-lr_model = joblib.load(os.path.join(models_dir, 'nate_logistic_regression.sav'))
-rf_model = joblib.load(os.path.join(models_dir, 'nate_random_forest.sav'))
-svm_model = joblib.load(os.path.join(models_dir, 'SVM_model.sav'))
-xgb_model = joblib.load(os.path.join(models_dir, 'XGBoost_model.sav'))
-svm_model_nos = joblib.load(os.path.join(models_dir, 'SVM_model_nos.sav'))
-svm_model_s = joblib.load(os.path.join(models_dir, 'SVM_model_s.sav'))
+from utils import encode_figure, prepare_data
+from model_registry import get_model
+from chart_data import CHART_POINTS, category_series, confusion_matrix_series
+from evaluation import EvaluationContext
+from rendering import FigureJob, render_jobs
 
 # Model dictionaries
 models = {
@@ -34,12 +26,13 @@ models = {
     'XGBoost': 'XGBoost'
 }
 
-loaded_models = {
-    'Decision Tree': dt_model,
-    'Logistic': lr_model,
-    'Random Forest': rf_model,
-    'SVM': svm_model,
-    'XGBoost': xgb_model
+# Registry keys of the compared models, resolved on first use
+model_keys = {
+    'Decision Tree': 'decision_tree',
+    'Logistic': 'logistic_regression',
+    'Random Forest': 'random_forest',
+    'SVM': 'svm',
+    'XGBoost': 'xgboost'
 }
 
 models_svm = {
@@ -47,9 +40,9 @@ models_svm = {
     'svm_s': 'SVM - with SMOTE'
 }
 
-loaded_models_svm = {
-    'svm_nos': svm_model_nos,
-    'svm_s': svm_model_s
+model_keys_svm = {
+    'svm_nos': 'svm_nos',
+    'svm_s': 'svm_s'
 }
 
 # Target labels
@@ -58,18 +51,17 @@ target_names = ['Stays', 'Exits']
 
 def encode_plot_to_base64():
     """Encodes the current plot as a base64 string."""
-    img = io.BytesIO()
-    plt.savefig(img, format='png')
+    encoded = base64.b64encode(encode_figure(plt.gcf())).decode()
     plt.close()
-    img.seek(0)
-    return base64.b64encode(img.getvalue()).decode()
+    return encoded
 
 
-def evaluation(fit_models, X_test, y_test):
+def evaluation(fit_models, context):
     """Evaluates models and returns a DataFrame with evaluation metrics."""
+    y_test = context.y('test')
     results = []
     for name, model in fit_models.items():
-        pred = model.predict(X_test)
+        pred = context.predict(model)
         results.append([
             name,
             precision_score(y_test, pred, average='macro'),
@@ -80,9 +72,8 @@ def evaluation(fit_models, X_test, y_test):
     return pd.DataFrame(results, columns=['model', 'precision', 'recall', 'f1_macro', 'accuracy']).set_index('model')
 
 
-def plot_confusion_matrix(model, X_test, y_test, title):
+def plot_confusion_matrix(y_test, pred, title):
     """Plots a confusion matrix."""
-    pred = model.predict(X_test)
     conf_mat = confusion_matrix(y_test, pred)
     plt.figure(figsize=(6, 6))
     sns.heatmap(conf_mat, annot=True, fmt='d', cmap='Blues', xticklabels=target_names, yticklabels=target_names)
@@ -129,9 +120,8 @@ def plot_model_metrics(eval_df):
     ax.grid(axis='y', linestyle='--', alpha=0.7)
     return encode_plot_to_base64()
 
-def plot_normalized_confusion_matrix(model, X_test, y_test, title):
+def plot_normalized_confusion_matrix(y_test, pred, title):
     """Plots a normalized confusion matrix."""
-    pred = model.predict(X_test)
     conf_mat = confusion_matrix(y_test, pred)
     conf_mat_normalized = conf_mat / conf_mat.sum(axis=1)[:, np.newaxis]
     plt.figure(figsize=(6, 6))
@@ -142,46 +132,71 @@ def plot_normalized_confusion_matrix(model, X_test, y_test, title):
     return encode_plot_to_base64()
 
 
-def generate_results():
-    # Load the dataset
-    data_path = os.path.join("Resources", "analytical_base_table.csv")
-    df = pd.read_csv(data_path)
+def results_series(eval_df, eval_svm, loaded_models, loaded_models_svm, context):
+    """Returns the summary charts and confusion matrices of generate_results as plain series."""
+    y_test = context.y('test')
+    metrics = ['accuracy', 'precision', 'recall', 'f1_macro']
+    results = {
+        "model_metrics": eval_df.to_dict(),
+        "svm_metrics": eval_svm.to_dict(),
+        "accuracy_pie": category_series(eval_df['accuracy'] * 100),
+        "model_performance_metrics": category_series(eval_df[metrics]),
+        "confusion_matrices": {}
+    }
+    for names, fit_models in ((models, loaded_models), (models_svm, loaded_models_svm)):
+        for model_key, model_name in names.items():
+            pred = context.predict(fit_models[model_key])
+            results["confusion_matrices"][model_name] = {
+                "normal": confusion_matrix_series(y_test, pred, normalize=False, labels=target_names),
+                "normalized": confusion_matrix_series(y_test, pred, labels=target_names)
+            }
+    return results
+
+
+def generate_results(output='images', points=CHART_POINTS):
+    # Training and testing sets, shared with every other report through the dataset cache
+    X_train, X_test, y_train, y_test, _, _ = prepare_data()
 
-    # Prepare features and target variable
-    y = df.Exited
-    X = df.drop(['Exited'], axis=1)
+    # Resolve models through the shared registry
+    loaded_models = {key: get_model(registry_key) for key, registry_key in model_keys.items()}
+    loaded_models_svm = {key: get_model(registry_key) for key, registry_key in model_keys_svm.items()}
 
-    # Split dataset into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=10, stratify=y)
+    # Predictions are computed once per model and reused by every metric and plot
+    context = EvaluationContext(X_train, y_train, X_test, y_test)
 
     # Evaluate all models
-    eval_df = evaluation(loaded_models, X_test, y_test)
+    eval_df = evaluation(loaded_models, context)
 
+    if output == 'data':
+        # Plain chart series for the client to draw; nothing is rendered
+        return results_series(eval_df, evaluation(loaded_models_svm, context), loaded_models, loaded_models_svm, context)
+
+    # Figures are collected as jobs and rendered together in the process pool
     results = {
         "model_metrics": eval_df.to_dict(),
-        "accuracy_pie": plot_accuracy_pie(eval_df),
-        "model_performance_metrics": plot_model_metrics(eval_df),
+        "accuracy_pie": FigureJob(plot_accuracy_pie, (eval_df,)),
+        "model_performance_metrics": FigureJob(plot_model_metrics, (eval_df,)),
         "confusion_matrices": {}
     }
 
     # Confusion matrix plots for each model
     for model_key, model_name in models.items():
         results["confusion_matrices"][model_name] = {
-            "normal": plot_confusion_matrix(loaded_models[model_key], X_test, y_test, f"{model_name} Confusion Matrix"),
-            "normalized": plot_normalized_confusion_matrix(loaded_models[model_key], X_test, y_test, f"{model_name} Normalized Confusion Matrix")
+            "normal": FigureJob(plot_confusion_matrix, (y_test, context.predict(loaded_models[model_key]), f"{model_name} Confusion Matrix")),
+            "normalized": FigureJob(plot_normalized_confusion_matrix, (y_test, context.predict(loaded_models[model_key]), f"{model_name} Normalized Confusion Matrix"))
         }
 
     # SMOTE Comparison (SVM models)
-    eval_svm = evaluation(loaded_models_svm, X_test, y_test)
+    eval_svm = evaluation(loaded_models_svm, context)
     results["svm_metrics"] = eval_svm.to_dict()
 
     for model_key, model_name in models_svm.items():
         results["confusion_matrices"][model_name] = {
-            "normal": plot_confusion_matrix(loaded_models_svm[model_key], X_test, y_test, f"{model_name} Confusion Matrix"),
-            "normalized": plot_normalized_confusion_matrix(loaded_models_svm[model_key], X_test, y_test, f"{model_name} Normalized Confusion Matrix")
+            "normal": FigureJob(plot_confusion_matrix, (y_test, context.predict(loaded_models_svm[model_key]), f"{model_name} Confusion Matrix")),
+            "normalized": FigureJob(plot_normalized_confusion_matrix, (y_test, context.predict(loaded_models_svm[model_key]), f"{model_name} Normalized Confusion Matrix"))
         }
 
-    return results
+    return render_jobs(results)
 
 
 # For testing purposes
@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def split_pipeline(model):
+    """Splits a saved model into its columntransformer and the steps after it.
+
+    Accepts a fitted GridSearchCV or a Pipeline. Returns (None, model) when the
+    model does not start with a columntransformer step.
+    """
+    pipeline = getattr(model, 'best_estimator_', model)
+    steps = getattr(pipeline, 'steps', None)
+    if not steps or len(steps) < 2 or steps[0][0] != 'columntransformer':
+        return None, model
+    return steps[0][1], pipeline[1:]
+
+
+def _update_digest(digest, value):
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            digest.update(repr(value.tolist()).encode())
+        else:
+            digest.update(f"{value.dtype}{value.shape}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def preprocessor_fingerprint(preprocessor):
+    """Hashes a fitted ColumnTransformer's structure, parameters and fitted state.
+
+    Two preprocessors with the same fingerprint produce identical output, so
+    the encoding can be computed once and shared between them.
+    """
+    digest = hashlib.sha1()
+    for name, transformer, columns in preprocessor.transformers_:
+        _update_digest(digest, (name, type(transformer).__name__, list(np.atleast_1d(columns))))
+        if isinstance(transformer, str):
+            continue
+        _update_digest(digest, sorted(transformer.get_params(deep=False).items()))
+        for attr, value in sorted(vars(transformer).items()):
+            # Fitted attributes only (scale_, min_, categories_, ...)
+            if attr.endswith('_') and not attr.startswith('_'):
+                _update_digest(digest, (attr, value))
+    return digest.hexdigest()
+
+
+class SharedPreprocessor:
+    """Wraps one fitted preprocessor and remembers its output for the latest frame.
+
+    Every model that shares this preprocessor asks for the same frame in turn
+    (or concurrently, in parallel mode); only the first call does the work.
+    """
+
+    def __init__(self, preprocessor):
+        self.preprocessor = preprocessor
+        self.transforms = 0
+        self._lock = threading.Lock()
+        self._frame = None
+        self._encoded = None
+
+    def transform(self, frame):
+        with self._lock:
+            if self._frame is not frame:
+                self._encoded = self.preprocessor.transform(frame)
+                self._frame = frame
+                self.transforms += 1
+            return self._encoded
+
+
+class EncodedPipeline:
+    """A saved pipeline split into a shared preprocessor and its remaining steps."""
+
+    def __init__(self, model, shared, estimator):
+        self.model = model
+        self.shared = shared
+        self.estimator = estimator
+
+    def predict(self, frame):
+        return self.estimator.predict(self.shared.transform(frame))
+
+    def predict_proba(self, frame):
+        return self.estimator.predict_proba(self.shared.transform(frame))
+
+
+def share_preprocessors(models):
+    """Groups models by identical preprocessors so each encoding runs once per batch.
+
+    Returns a dict with the same keys; models without a recognisable
+    columntransformer step are passed through unchanged.
+    """
+    shared_by_fingerprint = {}
+    shared_models = {}
+    for model_name, model in models.items():
+        try:
+            preprocessor, estimator = split_pipeline(model)
+            if preprocessor is None:
+                shared_models[model_name] = model
+                continue
+            fingerprint = preprocessor_fingerprint(preprocessor)
+        except Exception as e:
+            logger.warning(f"Not sharing preprocessing for {model_name}: {str(e)}")
+            shared_models[model_name] = model
+            continue
+
+        shared = shared_by_fingerprint.setdefault(fingerprint, SharedPreprocessor(preprocessor))
+        shared_models[model_name] = EncodedPipeline(model, shared, estimator)
+
+    logger.info(f"Shared encoding: {len(models)} models over {len(shared_by_fingerprint)} preprocessor(s)")
+    return shared_models
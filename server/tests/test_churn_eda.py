@@ -0,0 +1,20 @@
+import pytest
+
+from scripts.churn_eda import churn_segment
+
+
+@pytest.mark.parametrize('by, bins', [
+    ('Geography', [0, 1]),
+    ('Gender', [0, 1, 2]),
+    ('Age', [30, 18, 40]),
+    ('Age', [18, 30, 30, 40]),
+    ('Age', [18]),
+])
+def test_churn_segment_rejects_bins_it_cannot_apply(by, bins):
+    with pytest.raises(ValueError):
+        churn_segment(by, bins)
+
+
+def test_churn_segment_rejects_unknown_columns():
+    with pytest.raises(ValueError):
+        churn_segment('Surname')
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from compiled_models import compile_model, compile_models, verify_compiled
+from scoring import FEATURE_COLUMNS, build_feature_frame
+
+
+def customers(count, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        [
+            float(rng.integers(350, 851)),
+            str(rng.choice(['France', 'Germany', 'Spain'])),
+            str(rng.choice(['Female', 'Male'])),
+            float(rng.integers(18, 93)),
+            float(rng.integers(0, 11)),
+            float(rng.choice([0.0, rng.uniform(1, 250_000)])),
+            int(rng.integers(1, 5)),
+            int(rng.integers(0, 2)),
+            int(rng.integers(0, 2)),
+            float(rng.uniform(10, 200_000)),
+        ]
+        for _ in range(count)
+    ]
+
+
+def fitted(estimator, param_grid):
+    # Same layout as the saved models: a GridSearchCV over a positional columntransformer pipeline
+    train = build_feature_frame(customers(400, seed=1))
+    target = ((train['Age'] > 45) ^ (train['IsActiveMember'] == 1)).astype(int)
+    preprocess = make_column_transformer(
+        (MinMaxScaler(), [0, 3, 4, 5, 6, 7, 8, 9]),
+        (OneHotEncoder(sparse_output=False), [1, 2])
+    )
+    search = GridSearchCV(make_pipeline(preprocess, estimator), param_grid, cv=3)
+    return search.fit(train.to_numpy(), target)
+
+
+MODELS = {
+    'Logistic Regression': lambda: fitted(LogisticRegression(), {'logisticregression__C': [0.1, 1]}),
+    'Decision Tree': lambda: fitted(DecisionTreeClassifier(random_state=10), {'decisiontreeclassifier__max_depth': [3, 6]}),
+}
+
+
+@pytest.mark.parametrize('name', MODELS)
+def test_compiled_scorer_matches_pipeline_exactly_on_request_frames(name):
+    model = MODELS[name]()
+    frame = build_feature_frame(customers(500, seed=2))
+    assert list(frame.columns) == FEATURE_COLUMNS
+
+    compiled = compile_model(model)
+    assert verify_compiled(model, compiled, frame)
+    np.testing.assert_array_equal(model.predict(frame), compiled.predict(frame))
+    np.testing.assert_array_equal(model.predict_proba(frame), compiled.predict_proba(frame))
+
+
+def test_compile_models_keeps_models_that_cannot_be_compiled():
+    class Opaque:
+        def predict(self, frame):
+            return np.zeros(len(frame), dtype=int)
+
+    opaque = Opaque()
+    model = MODELS['Logistic Regression']()
+    compiled = compile_models({'Opaque': opaque, 'Logistic Regression': model}, build_feature_frame(customers(50, seed=3)))
+    assert compiled['Opaque'] is opaque
+    assert compiled['Logistic Regression'] is not model
+
+
+def test_verify_compiled_detects_a_mismatch():
+    model = MODELS['Logistic Regression']()
+    compiled = compile_model(model)
+    compiled.intercept = compiled.intercept + 100
+    assert not verify_compiled(model, compiled, build_feature_frame(customers(50, seed=4)))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_engine import ChurnCounts, churn_tables, segment_rates
+
+
+@pytest.fixture
+def customers():
+    rng = np.random.default_rng(7)
+    count = 5000
+    return pd.DataFrame({
+        'Geography': rng.choice(['France', 'Germany', 'Spain'], count),
+        'Gender': rng.choice(['Female', 'Male'], count),
+        'Age': rng.integers(18, 93, count),
+        'Exited': rng.integers(0, 2, count),
+    })
+
+
+def groupby_churn(df, column):
+    # The pandas groupby the EDA computed before it was streamed
+    grouped = df.groupby(column)['Exited'].agg(Count='value_counts')
+    counts = grouped.pivot_table(values='Count', index=column, columns='Exited', fill_value=0)
+    percentages = grouped.groupby(level=0).apply(lambda g: round(g * 100 / g.sum(), 2)).pivot_table(
+        values='Count', index=column, columns='Exited', fill_value=0
+    )
+    return counts, percentages
+
+
+def chunks(df, size):
+    return (df.iloc[start:start + size] for start in range(0, len(df), size))
+
+
+@pytest.mark.parametrize('column', ['Geography', 'Gender'])
+def test_streamed_tables_match_groupby_exactly(customers, column):
+    expected_counts, expected_percentages = groupby_churn(customers, column)
+    counts, percentages = churn_tables(chunks(customers, 777), [column])[column].table()
+
+    assert list(counts.index) == list(expected_counts.index)
+    np.testing.assert_array_equal(counts.to_numpy(), expected_counts.to_numpy())
+    np.testing.assert_array_equal(percentages.to_numpy(), expected_percentages.to_numpy())
+
+
+def test_chunk_size_does_not_change_the_tables(customers):
+    whole = ChurnCounts('Geography')
+    whole.update(customers)
+    streamed = churn_tables(chunks(customers, 13), ['Geography'])['Geography']
+    pd.testing.assert_frame_equal(whole.table()[0], streamed.table()[0])
+
+
+def test_segment_rates_match_groupby(customers):
+    segments, counts = segment_rates(customers['Geography'], customers['Exited'])
+    expected = customers.groupby(['Geography', 'Exited']).size().unstack(fill_value=0)
+    assert segments == list(expected.index)
+    np.testing.assert_array_equal(counts, expected.to_numpy())
+
+
+def test_binned_segment_rates_match_groupby_and_drop_rows_outside_the_bins(customers):
+    customers.loc[:9, 'Age'] = np.nan
+    bins = [18, 30, 40, 50, 60, 70]
+    segments, counts = segment_rates(customers['Age'], customers['Exited'], bins)
+
+    binned = pd.cut(customers['Age'], bins, right=False)
+    expected = customers.groupby([binned, 'Exited'], observed=True).size().unstack(fill_value=0)
+    assert segments == list(expected.index)
+    np.testing.assert_array_equal(counts, expected.to_numpy())
+    assert counts.sum() == binned.notna().sum()
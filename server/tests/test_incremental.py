@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+
+from incremental import encodable, parse_rows, read_delta
+
+HEADER = b"CreditScore,Geography,Gender,Age,Tenure,Balance,NumOfProducts,HasCrCard,IsActiveMember,EstimatedSalary,Exited\n"
+ROW = b"619,France,Female,42,2,0.0,1,1,1,101348.88,1\n"
+OTHER_ROW = b"608,Spain,Female,41,1,83807.86,1,0,1,112542.58,0\n"
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / 'abt.csv'
+    path.write_bytes(HEADER + ROW)
+    return path
+
+
+def test_read_delta_only_returns_complete_lines(table):
+    offset = table.stat().st_size
+    with open(table, 'ab') as f:
+        f.write(OTHER_ROW + ROW[:10])
+
+    delta, new_offset = read_delta(table, offset)
+    assert len(delta) == 1
+    assert delta['Geography'].tolist() == ['Spain']
+    # The half-written row starts at the new offset and is read once it is finished
+    assert new_offset == offset + len(OTHER_ROW)
+
+    with open(table, 'ab') as f:
+        f.write(ROW[10:])
+    delta, final_offset = read_delta(table, new_offset)
+    assert delta['Geography'].tolist() == ['France']
+    assert final_offset == table.stat().st_size
+
+
+def test_read_delta_without_a_complete_line(table):
+    offset = table.stat().st_size
+    assert read_delta(table, offset) == (None, offset)
+    with open(table, 'ab') as f:
+        f.write(ROW[:-1])
+    assert read_delta(table, offset) == (None, offset)
+
+
+def test_read_delta_refuses_a_truncated_file(table):
+    with pytest.raises(ValueError):
+        read_delta(table, table.stat().st_size + 1)
+
+
+def test_parse_rows_separates_malformed_rows(table):
+    offset = table.stat().st_size
+    with open(table, 'ab') as f:
+        f.write(OTHER_ROW + b"abc,Spain,Female,41,1,0.0,1,0,1,1.0,0\n" + b"600,,Male,41,1,0.0,1,0,1,1.0,0\n"
+                + b"600,Spain,Male,41,1,0.0,1,0,1,1.0,2\n")
+
+    delta, _ = read_delta(table, offset)
+    rows, rejected = parse_rows(delta)
+    assert len(rows) == 1 and len(rejected) == 3
+    assert rows['CreditScore'].tolist() == [608]
+    assert str(rows['CreditScore'].dtype) == 'int16'
+
+
+def test_encodable_flags_only_rows_with_unseen_categories():
+    X = np.array([[600, 'France'], [700, 'Spain']], dtype=object)
+    preprocess = make_column_transformer((MinMaxScaler(), [0]), (OneHotEncoder(), [1])).fit(X)
+
+    new = np.array([[650, 'Spain'], [650, 'Italy'], [610, 'France']], dtype=object)
+    np.testing.assert_array_equal(encodable(preprocess, new), [True, False, True])
+    assert encodable(preprocess, X).all()
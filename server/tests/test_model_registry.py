@@ -0,0 +1,83 @@
+import os
+
+import joblib
+import pytest
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(models_dir=str(tmp_path), model_files={'a': 'a.sav', 'b': 'b.sav'}, mmap_models=set())
+
+
+def publish(registry, key, model):
+    path = registry.path(key)
+    joblib.dump(model, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+def poll_until_stable(registry):
+    # The first poll that sees a new file only records it; the next one loads it
+    assert registry.check_for_updates() == []
+    return registry.check_for_updates()
+
+
+def test_missing_artifact_is_loaded_once_published(registry):
+    swaps = []
+    registry.add_listener(lambda key, version: swaps.append(key))
+    with pytest.raises(FileNotFoundError):
+        registry.get('a')
+    assert 'a' in registry.stats()['failed']
+    assert registry.check_for_updates() == []
+
+    publish(registry, 'a', {'weights': [1, 2]})
+    assert poll_until_stable(registry) == ['a']
+    assert registry.get('a') == {'weights': [1, 2]}
+    assert swaps == ['a']
+    assert registry.stats()['failed'] == {}
+
+
+def test_keys_never_asked_for_stay_unloaded(registry):
+    publish(registry, 'b', {'weights': [3]})
+    assert poll_until_stable(registry) == []
+    assert registry.stats()['loaded'] == []
+
+
+def test_changed_artifact_is_swapped_in(registry):
+    publish(registry, 'a', {'weights': [1]})
+    registry.get('a')
+    publish(registry, 'a', {'weights': [2]})
+    assert poll_until_stable(registry) == ['a']
+    assert registry.get('a') == {'weights': [2]}
+
+
+def test_watch_starts_one_watcher_per_process(registry, monkeypatch):
+    registry.watch(3600)
+    first = registry._watcher
+    registry.watch(3600)
+    assert registry._watcher is first
+
+    # A forked worker inherits the attributes but not the thread
+    monkeypatch.setattr(model_registry.os, 'getpid', lambda: -1)
+    registry.watch(3600)
+    assert registry._watcher is not first
+    assert registry._watcher.is_alive()
+
+
+def test_registered_loader_opens_its_artifact_and_is_watched(registry):
+    opened = []
+
+    def loader(path, version):
+        opened.append(version)
+        return ('proxy', version)
+
+    registry.register('c', 'c.sav', loader)
+    with pytest.raises(FileNotFoundError):
+        registry.get('c')
+
+    publish(registry, 'c', {'weights': [1]})
+    assert poll_until_stable(registry) == ['c']
+    assert registry.get('c') == ('proxy', registry.version('c'))
+    assert opened == [registry.version('c')]
@@ -0,0 +1,61 @@
+import prediction_cache
+from prediction_cache import PredictionCache
+
+VALUES = [619.0, 'France', 'Female', 42.0, 2.0, 0.0, 1, 1, 1, 101348.88]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_hit_after_put_and_miss_for_other_values():
+    cache = PredictionCache(maxsize=4, ttl=60)
+    cache.put(VALUES, 'v1', ['stays'])
+    assert cache.get(VALUES, 'v1') == ['stays']
+    assert cache.get(VALUES[:-1] + [1.0], 'v1') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prediction_cache.time, 'monotonic', clock.monotonic)
+    cache = PredictionCache(maxsize=4, ttl=60)
+    cache.put(VALUES, 'v1', ['stays'])
+
+    clock.now += 59
+    assert cache.get(VALUES, 'v1') == ['stays']
+    clock.now += 2
+    assert cache.get(VALUES, 'v1') is None
+    assert cache.stats()["size"] == 0
+
+
+def test_new_model_version_drops_every_entry():
+    cache = PredictionCache(maxsize=4, ttl=60)
+    cache.put(VALUES, 'v1', ['stays'])
+    assert cache.get(VALUES, 'v2') is None
+    # Going back to the old version does not resurrect its entries
+    assert cache.get(VALUES, 'v1') is None
+    assert cache.invalidations == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(maxsize=2, ttl=60)
+    first, second, third = ([float(n)] + VALUES[1:] for n in range(3))
+    cache.put(first, 'v1', ['first'])
+    cache.put(second, 'v1', ['second'])
+    assert cache.get(first, 'v1') == ['first']
+    cache.put(third, 'v1', ['third'])
+
+    assert cache.get(second, 'v1') is None
+    assert cache.get(first, 'v1') == ['first']
+    assert cache.get(third, 'v1') == ['third']
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(maxsize=0, ttl=60)
+    cache.put(VALUES, 'v1', ['stays'])
+    assert cache.get(VALUES, 'v1') is None
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import pytest
+
+from scoring import (
+    REQUIRED_KEYS,
+    build_feature_frame,
+    iter_csv_customers,
+    missing_fields,
+    parse_features,
+    predict_models,
+    stream_predictions,
+    validate_customers,
+)
+
+CUSTOMER = {
+    'creditScore': 619,
+    'geography': 'France',
+    'gender': 'Female',
+    'age': 42,
+    'tenure': 0,
+    'balance': 0,
+    'numofproducts': 1,
+    'hascrcard': 0,
+    'isactivemember': 0,
+    'estimatedsalary': 101348.88,
+}
+
+
+def test_missing_fields_accepts_numeric_zero():
+    assert missing_fields(CUSTOMER) == []
+
+
+@pytest.mark.parametrize('value', [None, ''])
+def test_missing_fields_rejects_empty_values(value):
+    assert missing_fields({**CUSTOMER, 'balance': value}) == ['balance']
+
+
+def test_missing_fields_reports_absent_keys_in_order():
+    data = {key: value for key, value in CUSTOMER.items() if key not in ('age', 'gender')}
+    assert missing_fields(data) == ['gender', 'age']
+    assert missing_fields({}) == REQUIRED_KEYS
+
+
+def test_parse_features_matches_form_strings_and_json_numbers():
+    as_strings = {key: str(value) for key, value in CUSTOMER.items()}
+    assert parse_features(as_strings) == parse_features(CUSTOMER)
+    assert parse_features(CUSTOMER) == [619.0, 'France', 'Female', 42.0, 0.0, 0.0, 1, 0, 0, 101348.88]
+
+
+def test_validate_customers_keeps_valid_rows_and_indexes_errors():
+    records = [CUSTOMER, {**CUSTOMER, 'age': 'old'}, 'not a customer', {**CUSTOMER, 'tenure': None}]
+    rows, errors = validate_customers(records)
+    assert rows == [parse_features(CUSTOMER)]
+    assert [error["index"] for error in errors] == [1, 2, 3]
+    assert errors[2]["error"] == "Missing fields: tenure"
+
+
+def test_build_feature_frame_has_the_training_column_order():
+    frame = build_feature_frame([parse_features(CUSTOMER)])
+    assert list(frame.columns) == [
+        'CreditScore', 'Geography', 'Gender', 'Age', 'Tenure',
+        'Balance', 'NumOfProducts', 'HasCrCard', 'IsActiveMember', 'EstimatedSalary'
+    ]
+    assert frame['Balance'].dtype == 'float64'
+
+
+def test_predict_models_skips_a_model_still_running_after_its_deadline():
+    release = threading.Event()
+
+    class Slow:
+        calls = 0
+
+        def predict(self, frame):
+            Slow.calls += 1
+            release.wait(5)
+            return [0] * len(frame)
+
+    class Fast:
+        def predict(self, frame):
+            return [1] * len(frame)
+
+    models = {'Slow straggler': Slow(), 'Fast': Fast()}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = list(predict_models(models, [None], executor=executor, timeout=0.05))
+        second = list(predict_models(models, [None], executor=executor, timeout=0.05))
+        release.set()
+
+    for results in (first, second):
+        assert isinstance(results[0][2], FutureTimeoutError)
+        assert results[1] == ('Fast', [1], None)
+    # The second call did not queue another predict behind the running one
+    assert Slow.calls == 1
+
+
+def test_stream_predictions_ends_malformed_csv_with_an_error_line():
+    class Model:
+        def predict(self, frame):
+            return [0] * len(frame)
+
+    header = ','.join(CUSTOMER) + '\n'
+    row = ','.join(str(value) for value in CUSTOMER.values()) + '\n'
+    oversized = '"' + 'x' * (csv.field_size_limit() + 1) + '"\n'
+    stream = io.BytesIO((header + row * 3 + oversized).encode())
+
+    lines = [json.loads(line) for line in stream_predictions({'Model': Model()}, iter_csv_customers(stream), 2)]
+    assert [line['index'] for line in lines] == [0, 1, 2]
+    assert 'predictions' in lines[1]
+    assert lines[-1]['error'].startswith('Invalid CSV')
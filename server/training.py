@@ -0,0 +1,384 @@
+import argparse
+import functools
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from keras_worker import KERAS_FILE
+from model_registry import MODEL_FILES, MODELS_DIR, file_version
+from utils import ABT_FILE, dataset_cache, prepare_data
+
+logger = logging.getLogger(__name__)
+
+RANDOM_STATE = 10
+
+# Artifact written for every trainable model; the registry's files plus the Keras search
+TRAINING_FILES = {**MODEL_FILES, 'keras': KERAS_FILE}
+
+# Versioned runs live under models/versions/<run id>/ next to the served artifacts
+VERSIONS_DIR = os.path.join(MODELS_DIR, 'versions')
+MANIFEST = 'manifest.json'
+
+# Cores given to each model's search, and how many searches run at once (default: all cores)
+TRAIN_THREADS_PER_JOB = int(os.environ.get('TRAIN_THREADS_PER_JOB', 2))
+TRAIN_WORKERS = int(os.environ.get('TRAIN_WORKERS', 0))
+
+# Sampled candidates for the Keras randomized search
+TRAIN_KERAS_ITERATIONS = int(os.environ.get('TRAIN_KERAS_ITERATIONS', 150))
+
+# Tuning mode (--tune): grids searched by successive halving instead of exhaustively
+HALVING_MODELS = {'random_forest', 'xgboost', 'svm', 'svm_s', 'svm_nos'}
+TUNE_HALVING_FACTOR = int(os.environ.get('TUNE_HALVING_FACTOR', 3))
+TUNE_MIN_SAMPLES = int(os.environ.get('TUNE_MIN_SAMPLES', 500))
+
+
+def preprocessor(num_features, cat_features):
+    # Columns are selected by position, as the saved pipelines expect plain arrays
+    from sklearn.compose import make_column_transformer
+    from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+
+    return make_column_transformer(
+        (MinMaxScaler(), num_features),
+        (OneHotEncoder(sparse_output=False), cat_features)
+    )
+
+
+def smote():
+    from imblearn.over_sampling import SMOTE
+
+    return SMOTE(sampling_strategy='auto', random_state=RANDOM_STATE)
+
+
+def grid_search(model, param_grid, threads, scoring, halving=False):
+    """Returns the exhaustive search over param_grid, or a successive-halving one when halving.
+
+    Successive halving scores every candidate on a small sample of the
+    training rows, keeps the best 1/TUNE_HALVING_FACTOR of them and retries
+    those on factor times more rows, so only the last few candidates are
+    fitted on all of the data.
+    """
+    if not halving:
+        from sklearn.model_selection import GridSearchCV
+
+        return GridSearchCV(model, param_grid, cv=5, scoring=scoring, n_jobs=threads)
+
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingGridSearchCV
+
+    return HalvingGridSearchCV(
+        model,
+        param_grid,
+        cv=5,
+        scoring=scoring,
+        factor=TUNE_HALVING_FACTOR,
+        min_resources=TUNE_MIN_SAMPLES,
+        n_jobs=threads,
+        random_state=RANDOM_STATE
+    )
+
+
+# Each search below is the one from its notebook in server/modelling_notebooks,
+# with n_jobs set to the job's thread budget. In tuning mode memory caches the
+# fitted columntransformer and SMOTE output, so candidates sharing a fold reuse them.
+
+def decision_tree_search(preprocess, threads, memory=None, halving=False):
+    from imblearn.pipeline import make_pipeline
+    from sklearn.tree import DecisionTreeClassifier
+
+    model = make_pipeline(preprocess, smote(), DecisionTreeClassifier(random_state=RANDOM_STATE), memory=memory)
+    param_grid = {
+        'decisiontreeclassifier__max_leaf_nodes': [2, 10, 20, 30],
+        'decisiontreeclassifier__min_samples_split': [2, 3, 4],
+        'decisiontreeclassifier__criterion': ['gini', 'entropy']
+    }
+    return grid_search(model, param_grid, threads, 'accuracy', halving)
+
+
+def logistic_regression_search(preprocess, threads, memory=None, halving=False):
+    from imblearn.pipeline import make_pipeline
+    from sklearn.linear_model import LogisticRegression
+
+    model = make_pipeline(preprocess, smote(), LogisticRegression(random_state=RANDOM_STATE), memory=memory)
+    param_grid = {
+        'logisticregression__C': [0.01, 0.05, 0.1, 0.5, 1, 5],
+        'logisticregression__solver': ['liblinear', 'newton-cg', 'lbfgs', 'sag', 'saga']
+    }
+    return grid_search(model, param_grid, threads, 'accuracy', halving)
+
+
+def random_forest_search(preprocess, threads, memory=None, halving=False):
+    from imblearn.pipeline import make_pipeline
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = make_pipeline(
+        preprocess, smote(), RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=1), memory=memory
+    )
+    param_grid = {
+        'randomforestclassifier__n_estimators': [50, 100, 150],
+        'randomforestclassifier__max_features': ['sqrt', 0.33],
+        'randomforestclassifier__min_samples_leaf': [1, 5, 10, 15],
+        'randomforestclassifier__criterion': ['gini', 'entropy'],
+        'randomforestclassifier__min_samples_split': [2, 3, 4]
+    }
+    return grid_search(model, param_grid, threads, 'accuracy', halving)
+
+
+SVM_PARAM_GRID = {
+    'svc__kernel': ['linear', 'rbf', 'poly', 'sigmoid'],
+    'svc__C': [0.0005, 0.001, 0.01, 0.1, 0.5],
+    'svc__gamma': [5, 1, 0.1, 0.01]
+}
+
+
+def svm_search(preprocess, threads, memory=None, halving=False, oversample=True, scoring='accuracy'):
+    from imblearn.pipeline import make_pipeline
+    from sklearn.svm import SVC
+
+    steps = [preprocess, smote()] if oversample else [preprocess]
+    model = make_pipeline(*steps, SVC(random_state=RANDOM_STATE), memory=memory)
+    return grid_search(model, SVM_PARAM_GRID, threads, scoring, halving)
+
+
+def xgboost_search(preprocess, threads, memory=None, halving=False):
+    import xgboost as xgb
+    from imblearn.pipeline import make_pipeline
+
+    model = make_pipeline(
+        preprocess,
+        smote(),
+        xgb.XGBClassifier(random_state=RANDOM_STATE, eval_metric='logloss', n_jobs=1),
+        memory=memory
+    )
+    param_grid = {
+        'xgbclassifier__gamma': [0.5, 0.8, 1],
+        'xgbclassifier__max_depth': [3, 4, 5, 6],
+        'xgbclassifier__n_estimators': [50, 100, 200]
+    }
+    return grid_search(model, param_grid, threads, 'f1_macro', halving)
+
+
+def knn_search(preprocess, threads, memory=None, halving=False):
+    from imblearn.pipeline import make_pipeline
+    from sklearn.neighbors import KNeighborsClassifier
+
+    model = make_pipeline(preprocess, smote(), KNeighborsClassifier(n_jobs=1), memory=memory)
+    param_grid = {
+        'kneighborsclassifier__n_neighbors': list(range(1, 31)),
+        'kneighborsclassifier__weights': ['uniform', 'distance'],
+        'kneighborsclassifier__algorithm': ['auto', 'ball_tree', 'kd_tree', 'brute']
+    }
+    return grid_search(model, param_grid, threads, 'accuracy', halving)
+
+
+def keras_search(preprocess, threads, memory=None, halving=False):
+    # TensorFlow reads its thread pools' sizes when it is first imported
+    os.environ['TF_NUM_INTRAOP_THREADS'] = '1'
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    from imblearn.pipeline import make_pipeline
+    from scikeras.wrappers import KerasClassifier
+    from scipy.stats import randint, uniform
+    from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold
+    from tensorflow.keras.losses import BinaryCrossentropy
+    from tensorflow.keras.metrics import Accuracy, Recall
+    import keras_model
+
+    clf = KerasClassifier(
+        model=keras_model.get_clf,
+        loss=BinaryCrossentropy,
+        metrics=[Accuracy, Recall],
+        hidden_layer_sizes=(64, 32,),
+        dropout=0.45,
+        batch_size=64,
+        optimizer='adam',
+        optimizer__learning_rate=0.0021,
+        epochs=8,
+        verbose=0,
+        random_state=RANDOM_STATE,
+    )
+    param_space = {
+        'kerasclassifier__epochs': randint(8, 12),
+        'kerasclassifier__batch_size': [64, 128],
+        'kerasclassifier__dropout': uniform(loc=0.4, scale=0.1),
+        'kerasclassifier__hidden_layer_sizes': [(64,), (64, 32,)],
+        'kerasclassifier__optimizer__learning_rate': uniform(loc=0.0015, scale=0.001)
+    }
+    return RandomizedSearchCV(
+        make_pipeline(preprocess, smote(), clf, memory=memory),
+        param_space,
+        n_iter=TRAIN_KERAS_ITERATIONS,
+        scoring='f1_weighted',
+        n_jobs=threads,
+        cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE),
+        random_state=RANDOM_STATE
+    )
+
+
+# Search behind every trainable model, slowest first so the long ones start straight away
+TRAINING_SEARCHES = {
+    'keras': keras_search,
+    'svm': svm_search,
+    'svm_s': functools.partial(svm_search, scoring=None),
+    'svm_nos': functools.partial(svm_search, oversample=False, scoring=None),
+    'random_forest': random_forest_search,
+    'knn': knn_search,
+    'xgboost': xgboost_search,
+    'logistic_regression': logistic_regression_search,
+    'decision_tree': decision_tree_search,
+}
+
+
+def limit_threads():
+    """Keeps native libraries single-threaded; a job's cores are spent on its search's n_jobs instead."""
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = '1'
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def search_fits(search):
+    """Returns how many (candidate, fold) fits the search ran, the measure of its CPU cost."""
+    candidates = getattr(search, 'n_candidates_', None)
+    if candidates is None:
+        candidates = [len(search.cv_results_['params'])]
+    return int(sum(candidates)) * search.n_splits_
+
+
+def train_model(key, run_dir, threads, tune=False):
+    """Fits one model's search on the prepare_data split and saves it in run_dir.
+
+    Runs in a worker process. Returns the model's manifest entry.
+    """
+    import joblib
+
+    started = time.perf_counter()
+    X_train, X_test, y_train, y_test, num_columns, cat_columns = prepare_data()
+    preprocess = preprocessor(
+        [X_train.columns.get_loc(column) for column in num_columns],
+        [X_train.columns.get_loc(column) for column in cat_columns]
+    )
+
+    # On disk, so the search's worker processes share one cache
+    cache_dir = os.path.join(run_dir, f".cache-{key}") if tune else None
+    halving = tune and key in HALVING_MODELS
+    search = TRAINING_SEARCHES[key](preprocess, threads, memory=cache_dir, halving=halving)
+    try:
+        # The notebooks fit on the underlying arrays, so the artifacts carry no column names
+        search.fit(X_train.to_numpy(), y_train)
+    finally:
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    fit_seconds = time.perf_counter() - started
+
+    # The cache is gone; the saved pipeline must not point at it
+    search.estimator.set_params(memory=None)
+    search.best_estimator_.set_params(memory=None)
+    path = os.path.join(run_dir, TRAINING_FILES[key])
+    joblib.dump(search, path)
+    return {
+        "file": TRAINING_FILES[key],
+        "version": file_version(path),
+        "search": type(search).__name__,
+        "fits": search_fits(search),
+        "best_params": {name: repr(value) for name, value in search.best_params_.items()},
+        "best_score": round(float(search.best_score_), 6),
+        "test_score": round(float(search.score(X_test.to_numpy(), y_test)), 6),
+        "fit_seconds": round(fit_seconds, 3),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def new_run():
+    """Creates the directory for a new versioned run and returns (run id, path)."""
+    run_id = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    run_dir = os.path.join(VERSIONS_DIR, run_id)
+    os.makedirs(run_dir)
+    return run_id, run_dir
+
+
+def publish(run_dir, entries):
+    """Copies the run's artifacts over the served ones, each by a rename the registry's watcher picks up."""
+    for entry in entries.values():
+        if entry.get("status") != 'done':
+            continue
+        target = os.path.join(MODELS_DIR, entry["file"])
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(os.path.join(run_dir, entry["file"]), tmp_path)
+        os.replace(tmp_path, target)
+
+
+def train(keys=None, threads=TRAIN_THREADS_PER_JOB, workers=TRAIN_WORKERS, publish_models=True, tune=False):
+    """Retrains the given models (all by default) in parallel and writes a versioned run with a manifest.
+
+    Up to workers searches run at once, each in its own process with a
+    budget of threads cores. tune caches preprocessing between candidates
+    and searches the HALVING_MODELS grids by successive halving. Returns the manifest.
+    """
+    keys = list(keys or TRAINING_SEARCHES)
+    unknown = [key for key in keys if key not in TRAINING_SEARCHES]
+    if unknown:
+        raise ValueError(f"Unknown models {unknown}; choose from {list(TRAINING_SEARCHES)}")
+    # Slowest first, whatever order they were asked for in
+    keys = [key for key in TRAINING_SEARCHES if key in keys]
+    threads = max(1, threads)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads)
+
+    run_id, run_dir = new_run()
+
+    # Load and split once here; forked workers inherit the cached frames
+    prepare_data()
+    limit_threads()
+
+    started = time.perf_counter()
+    entries = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(keys))) as executor:
+        futures = {executor.submit(train_model, key, run_dir, threads, tune): key for key in keys}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                entry = future.result()
+                entry["status"] = 'done'
+            except Exception as e:
+                logger.error(f"Error training {key}: {str(e)}")
+                entry = {"file": TRAINING_FILES[key], "status": 'failed', "error": str(e)}
+            entry["finished_after_seconds"] = round(time.perf_counter() - started, 3)
+            entries[key] = entry
+            print(f"{key}: {entry['status']} after {entry['finished_after_seconds']}s")
+
+    manifest = {
+        "run": run_id,
+        "data": {"file": ABT_FILE, "signature": dataset_cache.signature(ABT_FILE)},
+        "threads_per_job": threads,
+        "workers": workers,
+        "tune": tune,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "published": publish_models,
+        "models": {key: entries[key] for key in keys},
+    }
+    with open(os.path.join(run_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    if publish_models:
+        publish(run_dir, entries)
+    return manifest
+
+
+# Usage (from server/): python training.py [--threads 2] [--workers N] [--no-publish] [--tune] [decision_tree svm ...]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrain the saved models from prepare_data().")
+    parser.add_argument('models', nargs='*', help=f"models to train (default: all of {list(TRAINING_SEARCHES)})")
+    parser.add_argument('--threads', type=int, default=TRAIN_THREADS_PER_JOB, help="cores per model search")
+    parser.add_argument('--workers', type=int, default=TRAIN_WORKERS, help="searches run at once")
+    parser.add_argument('--no-publish', action='store_true', help="only write the versioned run")
+    parser.add_argument('--tune', action='store_true', help="cache preprocessing and use successive halving")
+    args = parser.parse_args()
+
+    result = train(args.models, args.threads, args.workers, publish_models=not args.no_publish, tune=args.tune)
+    print(f"Trained {len(result['models'])} models in {result['wall_seconds']}s -> "
+          f"{os.path.join(VERSIONS_DIR, result['run'])}")
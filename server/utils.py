@@ -1,35 +1,159 @@
 import base64
+import contextlib
+import contextvars
 import io
 import os
+import threading
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
+from columnar import MANIFEST, bundle_path, iter_bundle, read_bundle, read_manifest
+from model_registry import file_signature
 
-def prepare_data( test_size=0.3, random_state=10):
-    # Load data
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, './Resources/analytical_base_table.csv')
-    df = pd.read_csv(data_path)
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Resources')
+
+ABT_FILE = 'analytical_base_table.csv'
+CHURN_FILE = 'Churn_Modelling.csv'
+
+# Compact dtypes per dataset: categoricals for the text features, the
+# smallest integer type that holds each count or flag. Monetary columns
+# stay float64 so the models see exactly the values they were trained on.
+CUSTOMER_DTYPES = {
+    'CreditScore': 'int16',
+    'Geography': 'category',
+    'Gender': 'category',
+    'Age': 'int16',
+    'Tenure': 'int8',
+    'Balance': 'float64',
+    'NumOfProducts': 'int8',
+    'HasCrCard': 'int8',
+    'IsActiveMember': 'int8',
+    'EstimatedSalary': 'float64',
+    'Exited': 'int8',
+}
+DATASET_DTYPES = {
+    ABT_FILE: CUSTOMER_DTYPES,
+    CHURN_FILE: {'RowNumber': 'int32', 'CustomerId': 'int32', **CUSTOMER_DTYPES},
+}
+
+
+class DatasetCache:
+    """Loads each Resources dataset once per process and memoizes its train/test splits.
+
+    The columnar copy written by columnar.py is preferred over the CSV when it
+    exists and was converted from the current CSV. Entries are keyed on the
+    size and mtime of the file actually read, so a replaced file is re-read
+    on the next call. Frames are shared by every caller: treat them as
+    read-only and copy before mutating.
+    """
+
+    def __init__(self, resources_dir=RESOURCES_DIR, dtypes=DATASET_DTYPES):
+        self.resources_dir = resources_dir
+        self.dtypes = dtypes
+        self.loads = {}
+        self._frames = {}
+        self._splits = {}
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        return os.path.join(self.resources_dir, name)
+
+    def _source(self, name):
+        # (kind, signature, manifest) of what load() would read right now
+        csv_signature = file_signature(self.path(name))
+        bundle = bundle_path(self.path(name))
+        manifest = read_manifest(bundle)
+        if manifest is not None and (csv_signature is None or manifest["source"] == list(csv_signature)):
+            return 'columns', file_signature(os.path.join(bundle, MANIFEST)), manifest
+        return 'csv', csv_signature, None
+
+    def signature(self, name):
+        """Returns what identifies the current contents of a dataset: (source kind, size and mtime)."""
+        kind, signature, _ = self._source(name)
+        return kind, signature
+
+    def load(self, name, columns=None):
+        """Returns the dataset (or just the given columns) as a DataFrame, parsing it only when it changed."""
+        kind, signature, manifest = self._source(name)
+        key = (name, tuple(columns) if columns is not None else None)
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is None or cached[0] != (kind, signature):
+                if kind == 'columns':
+                    df = read_bundle(bundle_path(self.path(name)), columns, manifest)
+                else:
+                    df = pd.read_csv(self.path(name), usecols=columns, dtype=self.dtypes.get(name))
+                    if columns is not None:
+                        # usecols keeps file order; match the order asked for
+                        df = df[list(columns)]
+                cached = ((kind, signature), df)
+                self._frames[key] = cached
+                self.loads[name] = self.loads.get(name, 0) + 1
+            return cached[1]
+
+    def iter_chunks(self, name, columns=None, chunk_size=100_000):
+        """Yields the dataset in chunks of at most chunk_size rows without holding it in memory.
 
-    y = df.Exited
-    X = df.drop(['Exited'], axis=1)
+        Chunks are read straight from disk (never cached), so memory use is
+        bounded by chunk_size whatever the size of the file.
+        """
+        kind, _, _ = self._source(name)
+        if kind == 'columns':
+            yield from iter_bundle(bundle_path(self.path(name)), columns, chunk_size)
+            return
+        yield from pd.read_csv(self.path(name), usecols=columns, dtype=self.dtypes.get(name), chunksize=chunk_size)
 
-    num_columns = X.select_dtypes(include='number').columns.tolist()
-    cat_columns = X.select_dtypes(include='object').columns.tolist()
+    def split(self, name, test_size=0.3, random_state=10, target='Exited'):
+        """Returns (X_train, X_test, y_train, y_test), stratified on target, computed once per frame."""
+        df = self.load(name)
+        key = (name, test_size, random_state, target)
+        with self._lock:
+            cached = self._splits.get(key)
+            # A reloaded frame is a new object, which retires every split made from the old one
+            if cached is None or cached[0] is not df:
+                y = df[target]
+                X = df.drop([target], axis=1)
+                cached = (df, tuple(train_test_split(
+                    X, y, test_size=test_size, random_state=random_state, stratify=y
+                )))
+                self._splits[key] = cached
+            return cached[1]
 
-    # Split data into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state, stratify=y
-    )
+
+# Shared by every report and route in the process
+dataset_cache = DatasetCache()
+
+
+def prepare_data( test_size=0.3, random_state=10):
+    # Load data and split it into training and testing sets (both cached)
+    X_train, X_test, y_train, y_test = dataset_cache.split(ABT_FILE, test_size, random_state)
+
+    num_columns = X_train.select_dtypes(include='number').columns.tolist()
+    cat_columns = X_train.select_dtypes(include=['object', 'category']).columns.tolist()
 
     return X_train, X_test, y_train, y_test, num_columns, cat_columns
 
-# Helper function to encode a plot as a base64 string
-def encode_plot_to_base64(fig):
+# Image format figures are encoded in while rendering a report ('png' or 'svg')
+PLOT_FORMAT = contextvars.ContextVar('plot_format', default='png')
+
+@contextlib.contextmanager
+def plot_format(image_format):
+    """Encodes every figure rendered inside the block in image_format."""
+    token = PLOT_FORMAT.set(image_format)
+    try:
+        yield
+    finally:
+        PLOT_FORMAT.reset(token)
+
+# Helper function to encode a figure as image bytes in the active plot format
+def encode_figure(fig, **savefig_options):
     buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    encoded_string = base64.b64encode(buf.read()).decode('utf-8')
+    fig.savefig(buf, format=PLOT_FORMAT.get(), **savefig_options)
+    encoded = buf.getvalue()
     buf.close()
-    return encoded_string
\ No newline at end of file
+    return encoded
+
+# Helper function to encode a plot as a base64 string
+def encode_plot_to_base64(fig):
+    return base64.b64encode(encode_figure(fig, bbox_inches='tight')).decode('utf-8')